@@ -0,0 +1,229 @@
+"""
+Offline benchmark suite for the decision, update and PPD hot paths
+
+    python benchmarks/run.py                      # run and print every benchmark
+    python benchmarks/run.py --save results.json  # keep the results
+    python benchmarks/run.py --compare            # flag regressions vs baseline.json
+    python benchmarks/run.py --filter choose_arm  # only matching benchmarks
+
+Every timing is the best of several timeit repeats, which is the least noisy
+estimate on a shared machine. --compare exits with status 1 when any benchmark
+is more than --tolerance (default 25%) worse than the stored baseline; refresh
+the baseline with --save benchmarks/baseline.json after an intended change.
+"""
+
+from argparse import ArgumentParser
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+sys.path.insert(0, ROOT)
+
+from thompson_sampling.bernoulli import BernoulliExperiment  # noqa: E402
+from thompson_sampling.exponential import ExponentialExperiment  # noqa: E402
+from thompson_sampling.poisson import PoissonExperiment  # noqa: E402
+
+EXPERIMENTS = {
+    "bernoulli": (BernoulliExperiment, lambda rng, n: rng.integers(0, 2, n)),
+    "poisson": (PoissonExperiment, lambda rng, n: rng.poisson(3, n)),
+    "exponential": (ExponentialExperiment, lambda rng, n: rng.exponential(2, n)),
+}
+ARM_COUNTS = [2, 10, 100, 1000]
+BATCH_SIZES = [10, 1000, 100000]
+PPD_SIZES = [1000, 100000, 1000000]
+REPEATS = 5
+
+
+def best_time(statement, number: int = None) -> float:
+    """
+    Seconds per call of statement, the best of REPEATS timeit runs
+    """
+    timer = timeit.Timer(statement)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(REPEATS, number)) / number
+
+
+def bench_choose_arm():
+    for name, (cls, _) in EXPERIMENTS.items():
+        for arms in ARM_COUNTS:
+
+            def measure(cls=cls, arms=arms):
+                return best_time(cls(arms, rng=0).choose_arm) * 1e6
+
+            yield f"choose_arm/{name}/arms={arms}", "us", "lower", measure
+
+
+def bench_add_rewards():
+    for name, (cls, rewards) in EXPERIMENTS.items():
+        for size in BATCH_SIZES:
+
+            def measure(cls=cls, rewards=rewards, size=size):
+                rng = np.random.default_rng(0)
+                labels = rng.choice([f"option{i + 1}" for i in range(10)], size)
+                outcomes = [
+                    {"label": label, "reward": reward}
+                    for label, reward in zip(
+                        labels.tolist(), rewards(rng, size).tolist()
+                    )
+                ]
+                experiment = cls(10, rng=0)
+                return size / best_time(lambda: experiment.add_rewards(outcomes))
+
+            yield f"add_rewards/{name}/batch={size}", "rows/s", "higher", measure
+
+
+def bench_get_ppd():
+    for name, (cls, _) in EXPERIMENTS.items():
+        for size in PPD_SIZES:
+
+            def measure(cls=cls, size=size):
+                experiment = cls(3, rng=0)
+                return best_time(lambda: experiment.get_ppd(size=size), number=1) * 1e3
+
+            yield f"get_ppd/{name}/size={size}", "ms", "lower", measure
+
+
+_IMPORT_TIME = """
+import time
+start = time.perf_counter()
+import thompson_sampling.{module}
+print((time.perf_counter() - start) * 1e3)
+"""
+# peak RSS is inherited across exec on Linux, so import memory is measured as
+# the allocations Python and NumPy report to tracemalloc instead
+_IMPORT_MEMORY = """
+import tracemalloc
+tracemalloc.start()
+import thompson_sampling.{module}
+print(tracemalloc.get_traced_memory()[1] / 2 ** 20)
+"""
+
+
+def _fresh_import(script: str, module: str) -> float:
+    """
+    Best of REPEATS fresh interpreters running script for module
+    """
+    return min(
+        float(
+            subprocess.run(
+                [sys.executable, "-c", script.format(module=module)],
+                cwd=ROOT,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(REPEATS)
+    )
+
+
+def bench_import():
+    for name in EXPERIMENTS:
+        yield f"import/{name}/time", "ms", "lower", lambda m=name: _fresh_import(
+            _IMPORT_TIME, m
+        )
+        yield f"import/{name}/memory", "MiB", "lower", lambda m=name: _fresh_import(
+            _IMPORT_MEMORY, m
+        )
+
+
+def bench_memory():
+    for name, (cls, _) in EXPERIMENTS.items():
+
+        def measure(cls=cls):
+            tracemalloc.start()
+            experiment = cls(100000)
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del experiment
+            return size / 100000
+
+        yield f"memory/{name}/arms=100000", "bytes/arm", "lower", measure
+
+
+# each benchmark yields (name, unit, "lower" or "higher" is better, measure), and
+# measure() is only called for the names selected by --filter
+BENCHMARKS = [
+    bench_choose_arm,
+    bench_add_rewards,
+    bench_get_ppd,
+    bench_import,
+    bench_memory,
+]
+
+
+def run(pattern: str = "") -> dict:
+    results = {}
+    for bench in BENCHMARKS:
+        for name, unit, better, measure in bench():
+            if pattern in name:
+                value = measure()
+                results[name] = {"value": value, "unit": unit, "better": better}
+                print(f"{name:45} {value:14.3f} {unit}", flush=True)
+    return {
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Names of the benchmarks in both runs that got worse by more than tolerance
+    """
+    regressions = []
+    print(f"\n{'benchmark':45} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before, after = baseline["results"][name]["value"], result["value"]
+        # slowdown > 1 means worse, whichever direction is better for the metric
+        slowdown = after / before if result["better"] == "lower" else before / after
+        flag = "  REGRESSION" if slowdown > 1 + tolerance else ""
+        print(f"{name:45} {before:12.3f} {after:12.3f} {slowdown - 1:+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filter", default="", help="only run names containing it")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const=BASELINE,
+        help="compare with a saved run (default benchmarks/baseline.json)",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    current = run(args.filter)
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(current, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(current, json.load(handle), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
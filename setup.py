@@ -14,6 +14,6 @@ setup(
     url="https://github.com/Anton1o-I/thompson-sampling",
     long_description=long_description,
     long_description_content_type="text/markdown",
-    install_requires=["typing", "numpy", "seaborn", "matplotlib", "pandas"],
+    install_requires=["typing", "numpy", "scipy", "seaborn", "matplotlib", "pandas"],
     tests_require=["pytest"],
 )
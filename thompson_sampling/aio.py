@@ -0,0 +1,177 @@
+from collections import deque
+import asyncio
+import numpy as np
+from thompson_sampling.base import BaseThompsonSampling
+
+
+class AsyncExperiment:
+    """
+    asyncio front end that coalesces concurrent requests into batched work
+
+    Every choose() awaiting within window seconds of the first one (or until
+    max_batch are waiting) is answered from a single vectorized choose_arms
+    draw. report() calls are buffered and applied in one bulk update once
+    flush_size rewards are pending or flush_interval seconds after the first of
+    them. All work runs on the event loop thread, so the experiment needs no
+    locking.
+
+    Backpressure: at most max_waiting choose() calls are admitted at once and
+    later callers wait for a slot, and the reward buffer never holds more than
+    flush_size rewards. Wrap calls in asyncio.wait_for to shed load instead.
+
+    async with AsyncExperiment(BernoulliExperiment(arms=3)) as service:
+        label = await service.choose()
+        await service.report(label, 1)
+    """
+
+    def __init__(
+        self,
+        experiment: BaseThompsonSampling,
+        window: float = 0.001,
+        max_batch: int = 1024,
+        max_waiting: int = 10000,
+        flush_size: int = 1000,
+        flush_interval: float = 0.05,
+    ):
+        if max_batch < 1 or max_waiting < 1 or flush_size < 1:
+            raise ValueError("max_batch, max_waiting and flush_size must be positive")
+        self.experiment = experiment
+        self.window = window
+        self.max_batch = max_batch
+        self.max_waiting = max_waiting
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._admitted = 0
+        self._admission = deque()
+        self._waiters = []
+        self._choose_timer = None
+        self._labels = []
+        self._rewards = []
+        self._flush_timer = None
+
+    @property
+    def waiting(self) -> int:
+        """
+        Number of choose() calls waiting for the next batch draw
+        """
+        return len(self._waiters)
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of reported rewards not yet applied to the posteriors
+        """
+        return len(self._labels)
+
+    async def choose(self):
+        """
+        One Thompson sampling decision, drawn together with every other call
+        made in the same window
+        """
+        loop = asyncio.get_running_loop()
+        await self._admit(loop)
+        try:
+            future = loop.create_future()
+            self._waiters.append(future)
+            if len(self._waiters) >= self.max_batch:
+                self._dispatch()
+            elif self._choose_timer is None:
+                self._choose_timer = loop.call_later(self.window, self._dispatch)
+            return await future
+        finally:
+            self._release()
+
+    async def _admit(self, loop):
+        """
+        Waits, first come first served, until fewer than max_waiting calls are
+        in flight; asyncio.Semaphore wakes waiters in O(n) on Python < 3.12
+        """
+        if self._admitted < self.max_waiting and not self._admission:
+            self._admitted += 1
+            return
+        slot = loop.create_future()
+        self._admission.append(slot)
+        try:
+            await slot
+        except asyncio.CancelledError:
+            # a slot handed over just before cancellation must be passed on
+            if slot.done() and not slot.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        """
+        Hands the finished call's slot to the next admitted caller
+        """
+        while self._admission:
+            slot = self._admission.popleft()
+            if not slot.done():
+                slot.set_result(None)
+                return
+        self._admitted -= 1
+
+    def _dispatch(self):
+        if self._choose_timer is not None:
+            self._choose_timer.cancel()
+            self._choose_timer = None
+        batch, self._waiters = self._waiters, []
+        if not batch:
+            return
+        try:
+            # through the timed method, so each batch draw shows up in the
+            # choose_arms latency histogram of an instrumented experiment
+            choices = self.experiment.choose_arms(len(batch), as_labels=False)
+        except Exception as error:
+            for future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        labels = self.experiment._store.labels
+        for future, i in zip(batch, choices.tolist()):
+            if not future.done():
+                future.set_result(labels[i])
+
+    async def report(self, label, reward: float):
+        """
+        Queues a reward for the next batched posterior update
+        """
+        if label not in self.experiment._store:
+            raise KeyError(label)
+        self._labels.append(label)
+        self._rewards.append(reward)
+        if len(self._labels) >= self.flush_size:
+            self.flush()
+        elif self._flush_timer is None:
+            loop = asyncio.get_running_loop()
+            self._flush_timer = loop.call_later(self.flush_interval, self.flush)
+
+    def flush(self):
+        """
+        Applies every queued reward to the experiment now
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._labels:
+            # rewards for arms removed since they were queued are dropped
+            store = self.experiment._store
+            current = [label in store for label in self._labels]
+            labels = np.asarray(self._labels)[current]
+            rewards = np.asarray(self._rewards, dtype=np.float64)[current]
+            self.experiment.add_rewards_bulk(labels, rewards)
+            # cleared only once applied, so a failed update loses nothing
+            self._labels, self._rewards = [], []
+        return self
+
+    async def aclose(self):
+        """
+        Answers any waiting choose() calls and applies queued rewards
+        """
+        self._dispatch()
+        self.flush()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
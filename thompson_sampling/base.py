@@ -1,19 +1,64 @@
-from numpy.random import beta, gamma, binomial, exponential
-from functools import partial
-from pandas import Series, DataFrame
-import operator
-import seaborn as sns
-import matplotlib.pyplot as plt
-from typing import List
-from itertools import combinations
+from numpy.random import default_rng
+import numpy as np
+from typing import List, TYPE_CHECKING
+from thompson_sampling.metrics import timed
+from thompson_sampling.store import PosteriorStore
+
+# pandas, scipy and the plotting stack are only imported where they are used, so
+# that processes which just choose arms and add rewards only pay for NumPy
+if TYPE_CHECKING:
+    from pandas import Series
+
+# Largest theta matrix, in elements, that the batch methods draw in one go
+MAX_SAMPLES = 2 ** 22
+# Up to this many arms a single theta per arm is drawn with one scalar sampler
+# call each: numpy's array-argument samplers cost ~20us of fixed overhead, more
+# than a handful of ~1-2us scalar calls. Both consume the stream identically.
+SCALAR_DRAW_ARMS = 8
+
+
+def group_rewards(labels, rewards):
+    """
+    Collapses row-level outcomes into per-label sufficient statistics
+
+    Returns the distinct labels, how many rows each had and the sum of their
+    rewards, which is all the conjugate updates need.
+    """
+    labels = np.asarray(labels)
+    rewards = np.asarray(rewards, dtype=np.float64)
+    if labels.shape != rewards.shape or labels.ndim != 1:
+        raise ValueError(
+            f"labels and rewards must be 1-d and the same length, got "
+            f"{labels.shape} and {rewards.shape}"
+        )
+    if labels.size == 0:
+        return [], np.empty(0), np.empty(0)
+    uniques, inverse = np.unique(labels, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(uniques)).astype(np.float64)
+    totals = np.bincount(inverse, weights=rewards, minlength=len(uniques))
+    return uniques.tolist(), counts, totals
 
 
 class BasePrior:
+    # names of the distribution parameters the prior produces for every arm
+    _params = ()
+
     def __init__(self):
-        self.priors = {}
+        self._store = PosteriorStore([], {name: [] for name in self._params})
 
-    def _param_calculator(self, *args):
-        return self
+    @property
+    def priors(self):
+        """
+        Read-only {label: {param: value}} view of the priors added so far
+        """
+        return self._store.view()
+
+    def _param_arrays(self, means, variances, effective_sizes):
+        """
+        Computes the prior parameters of many arms at once from float arrays of
+        moments, returning ({param: array}, {error message: invalid row mask})
+        """
+        raise NotImplementedError
 
     def add_one(
         self, mean: float, variance: float, effective_size: int, label: str
@@ -21,20 +66,24 @@ class BasePrior:
         """
         Allows for individual priors to be specified and added to the priors list
         """
-
-        new_prior = {label: self._param_calculator(mean, variance, effective_size)}
-        self.priors.update(new_prior)
-        return self
+        return self.add_multiple([mean], [variance], [effective_size], [label])
 
     def add_multiple(
-        self, means: Series, variances: Series, effective_sizes: Series, labels: Series
+        self,
+        means: "Series",
+        variances: "Series",
+        effective_sizes: "Series",
+        labels: "Series",
     ) -> List[dict]:
         """
         Allows for a group of priors to be specified at once
         information: DataFrame
+
+        All rows are converted and validated as arrays, and a single ValueError
+        lists every invalid row. Missing values can be None or NaN.
         """
         params = [means, variances, effective_sizes, labels]
-        if any([len(a) != len(b) for a, b in list(combinations(params, 2))]):
+        if len({len(values) for values in params}) > 1:
             message = (
                 f"Lengths of given series do not match. Lengths - "
                 f"mean:{len(means)}, "
@@ -43,51 +92,499 @@ class BasePrior:
                 f"labels:{len(labels)}"
             )
             raise ValueError(message)
-        for i, _ in enumerate(labels):
-            new_prior = {
-                labels[i]: self._param_calculator(
-                    means[i], variances[i], effective_sizes[i]
-                )
-            }
-            self.priors.update(new_prior)
+        labels = labels.tolist() if hasattr(labels, "tolist") else list(labels)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            arrays, invalid = self._param_arrays(
+                *(np.asarray(values, dtype=np.float64) for values in params[:3])
+            )
+        problems = [
+            f"{message} for {[labels[i] for i in np.flatnonzero(mask)]}"
+            for message, mask in invalid.items()
+            if mask.any()
+        ]
+        if problems:
+            raise ValueError("; ".join(problems))
+        self._store.update(labels, arrays)
         return self
 
 
 class BaseThompsonSampling:
     _default = {}
     _posterior = ""
+    _minimize = False
+    _metrics = None
 
-    def __init__(self, arms: int = None, priors: BasePrior = None, labels: list = None):
-        self._avail_posteriors = {"beta": partial(beta), "gamma": partial(gamma)}
+    def __init__(
+        self,
+        arms: int = None,
+        priors: BasePrior = None,
+        labels: list = None,
+        rng=None,
+    ):
+        self._rng = default_rng(rng)
         if arms is None and priors is None:
             raise ValueError("Must have either arms or priors specified")
         if priors:
-            self.posteriors = priors.priors
+            store = priors._store.copy()
+            self._store = PosteriorStore(
+                store.labels, self._stored_params(store.params)
+            )
         elif arms:
-            self.posteriors = {
-                (f"{labels[i]}" if labels else f"option{i+1}"): self._default.copy()
-                for i in range(arms)
-            }
+            self._store = PosteriorStore.from_default(
+                [(f"{labels[i]}" if labels else f"option{i+1}") for i in range(arms)],
+                self._default,
+            )
+        self._posteriors = self._store.view(self._sampling_params)
+
+    @classmethod
+    def _from_store(cls, store: PosteriorStore, rng=None):
+        """
+        Builds an experiment directly on top of an existing PosteriorStore
+        """
+        experiment = cls.__new__(cls)
+        experiment._rng = default_rng(rng)
+        experiment._store = store
+        experiment._posteriors = store.view(experiment._sampling_params)
+        return experiment
+
+    def save(self, path):
+        """
+        Atomically writes the posterior state to a compact binary snapshot,
+        see thompson_sampling.snapshot
+        """
+        from thompson_sampling.snapshot import save
+
+        save(self, path)
+        return self
+
+    @classmethod
+    def load(cls, path, mmap_mode: str = "r", rng=None):
+        """
+        Restores an experiment from a snapshot written by save
+
+        By default the parameter arrays are read-only memory maps shared with
+        every other process that loads the same file; pass mmap_mode="c" to
+        allow private updates or None to read the arrays into memory.
+        """
+        from thompson_sampling.snapshot import load
+
+        return load(path, cls, mmap_mode, rng)
+
+    @property
+    def posteriors(self):
+        """
+        Read-only {label: {param: value}} view of the posterior parameters
+        """
+        return self._posteriors
 
     def _sample_posterior(self, size: int = None, key: str = None):
-        return self._avail_posteriors[self._posterior](
-            size=size, **self.posteriors[key]
+        return getattr(self._rng, self._posterior)(size=size, **self.posteriors[key])
+
+    def instrument(self, metrics=None):
+        """
+        Installs a thompson_sampling.metrics.Metrics collector (a new one by
+        default) that records latency, decision, reward and sample counts and
+        per-arm totals, and returns it
+        """
+        from thompson_sampling.metrics import Metrics
+
+        self._metrics = Metrics() if metrics is None else metrics
+        return self._metrics
+
+    def uninstrument(self):
+        """
+        Removes the metrics collector, making the hot paths unobserved again
+        """
+        self._metrics = None
+        return self
+
+    def reseed(self, rng=None):
+        """
+        Replaces the random number generator used for every draw
+
+        rng may be a numpy Generator, a seed or None for fresh OS entropy; use
+        thompson_sampling.rng.spawn_generators to give parallel workers
+        independent streams.
+        """
+        self._rng = default_rng(rng)
+        return self
+
+    @staticmethod
+    def _update_params(params: dict, idx, counts, totals):
+        """
+        Applies the conjugate update in place for the arms at idx, given how
+        many rewards each received (counts) and their sum (totals)
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _mean_reward(params: dict):
+        """
+        Expected reward of every arm under the sampling parameters given
+        """
+        raise NotImplementedError
+
+    def add_rewards(self, outcomes: List[dict]):
+        """
+        Takes in a list of dictionaries with the results and updates the Posterior
+        distribution for the label.
+
+        outcomes = [{"label": "A", "reward": 1}, {"label":"B", "reward":0}]
+
+        """
+        return self.add_rewards_bulk(
+            [result["label"] for result in outcomes],
+            [result["reward"] for result in outcomes],
+        )
+
+    @timed("add_rewards")
+    def add_rewards_bulk(self, labels, rewards=None):
+        """
+        Updates the posteriors from columns of outcomes instead of a list of dicts
+
+        labels and rewards can be lists, NumPy arrays or pandas Series, or a
+        DataFrame with "label" and "reward" columns can be passed on its own.
+        Rows are grouped by arm and each arm gets one closed-form update.
+
+        experiment.add_rewards_bulk(["A", "B", "A"], [1, 0, 1])
+        experiment.add_rewards_bulk(df)
+        """
+        if rewards is None:
+            labels, rewards = labels["label"], labels["reward"]
+        uniques, counts, totals = group_rewards(labels, rewards)
+        idx = self._store.positions(uniques)
+        self._update_params(self._store.params, idx, counts, totals)
+        if self._metrics is not None:
+            self._metrics.record_rewards(uniques, counts, totals)
+        return self
+
+    def add_rewards_stream(
+        self,
+        source,
+        chunksize: int = 100000,
+        format: str = None,
+        checkpoint=None,
+        offset: int = 0,
+        label: str = "label",
+        reward: str = "reward",
+    ):
+        """
+        Updates the posteriors from a CSV/JSON-lines file, file object or
+        iterator of outcomes, reading chunksize rows at a time so memory stays
+        constant; label and reward name the columns or keys to read. See
+        thompson_sampling.streaming.ingest_stream for checkpoints
+
+        experiment.add_rewards_stream("rewards.csv", checkpoint="state.snap")
+        """
+        from thompson_sampling.streaming import ingest_stream
+
+        return ingest_stream(
+            self, source, chunksize, format, checkpoint, offset, label, reward
         )
 
+    def add_arm(self, label, params: dict = None):
+        """
+        Adds a new arm mid-experiment, starting from params ({param: value}
+        in the same form as .posteriors) or the default prior
+
+        The existing posteriors are untouched and the arrays only grow when their
+        spare capacity runs out, so this is amortized O(1).
+        """
+        self._store.append(
+            label, self._default if params is None else self._stored_params(params)
+        )
+        return self
+
+    def remove_arm(self, label):
+        """
+        Drops an arm in O(1) by moving the last arm into its slot; later
+        decisions only sample the remaining arms
+
+        The moved arm changes position, so arm indices (e.g. from choose_arms
+        with as_labels=False) taken before the removal no longer apply.
+        """
+        if label in self._store and len(self._store) == 1:
+            raise ValueError("Cannot remove the last arm of an experiment")
+        self._store.remove(label)
+        return self
+
+    def retire_dominated_arms(
+        self, threshold: float = 0.01, draws: int = 2000, exact: bool = False
+    ) -> list:
+        """
+        Removes every arm whose probability of being best is below threshold
+
+        The probabilities are estimated from draws posterior draws, made in
+        vectorized chunks, which is linear in the number of arms; with exact
+        they are computed by quadrature instead wherever it converges, which
+        is precise but grows quadratically. The most likely best arm is always kept. Returns the
+        labels that were removed. As with remove_arm, each removal moves the
+        last arm into the freed slot, re-indexing the remaining arms.
+        """
+        if exact:
+            prob = self._probability_best(draws, max_arms=len(self._store))
+        else:
+            prob = self._estimate_best(draws)
+        keep = int(prob.argmax())
+        labels = self._store.labels
+        retired = [
+            labels[i] for i in np.flatnonzero(prob < threshold).tolist() if i != keep
+        ]
+        for label in retired:
+            self._store.remove(label)
+        return retired
+
+    @staticmethod
+    def _stored_params(params: dict) -> dict:
+        """
+        Converts parameters in the form the priors and .posteriors use to the
+        form the store keeps; the inverse of _sampling_params
+        """
+        return params
+
+    def _sampling_params(self, params: dict = None) -> dict:
+        """
+        Parameter arrays in the form, and argument order, the numpy sampler for
+        _posterior expects, for the stored params given (the experiment's own
+        by default)
+        """
+        return self._store.params if params is None else params
+
+    def _draw(self, size: int = None, params: dict = None, rng=None):
+        """
+        Draws one theta for every arm with a single vectorized sampler call
+
+        With size given the result is a (size, arms) matrix of independent draws.
+        params and rng default to the experiment's own, and can be overridden
+        to sample from a snapshot of the parameters or another stream.
+        """
+        params = self._sampling_params() if params is None else params
+        sampler = getattr(self._rng if rng is None else rng, self._posterior)
+        arms = len(next(iter(params.values())))
+        if size is None and arms <= SCALAR_DRAW_ARMS:
+            rows = zip(*(values.tolist() for values in params.values()))
+            theta = np.array([sampler(*row) for row in rows])
+        else:
+            theta = sampler(size=size if size is None else (size, arms), **params)
+        if self._metrics is not None:
+            self._metrics.record_samples(theta.size)
+        return theta
+
+    def _draw_per_arm(self, size: int):
+        """
+        Draws size thetas for every arm as an (arms, size) matrix, one row per arm
+        """
+        params = {k: v[:, None] for k, v in self._sampling_params().items()}
+        theta = getattr(self._rng, self._posterior)(
+            size=(len(self._store), size), **params
+        )
+        if self._metrics is not None:
+            self._metrics.record_samples(theta.size)
+        return theta
+
+    def _probability_best(self, draws: int = 10000, max_arms: int = None):
+        """
+        Probability that each arm is the best one
+
+        It is computed by quadrature for up to max_arms arms (by default
+        thompson_sampling.analytic.MAX_QUADRATURE_ARMS) and estimated from draws
+        posterior draws for more arms, or when the quadrature does not converge.
+        """
+        from thompson_sampling.analytic import MAX_QUADRATURE_ARMS, probability_best
+
+        max_arms = MAX_QUADRATURE_ARMS if max_arms is None else max_arms
+        if len(self._store) <= max_arms:
+            try:
+                return probability_best(
+                    self._posterior, self._sampling_params(), self._minimize
+                )
+            except ValueError:
+                # integration error above tolerance, e.g. for very spiky priors
+                pass
+        return self._estimate_best(draws)
+
+    def _estimate_best(self, draws: int, max_samples: int = MAX_SAMPLES):
+        """
+        Monte Carlo estimate of the probability that each arm is the best one
+        """
+        arms = len(self._store)
+        rows = max(1, max_samples // arms)
+        wins = np.zeros(arms)
+        for start in range(0, draws, rows):
+            theta = self._draw(min(rows, draws - start))
+            wins += np.bincount(self._best_indices(theta), minlength=arms)
+        return wins / draws
+
+    def _best_index(self, theta, rng=None) -> int:
+        """
+        Index of the winning theta (max, or min when _minimize is set), with
+        ties broken uniformly at random
+        """
+        index = int(theta.argmin() if self._minimize else theta.argmax())
+        # ties are rare with continuous posteriors, so only look for them
+        # when the winning value occurs more than once
+        if np.count_nonzero(theta == theta[index]) == 1:
+            return index
+        rng = self._rng if rng is None else rng
+        ties = np.flatnonzero(theta == theta[index])
+        # rng.choice costs ~10us; diffuse Gamma priors tie at 0 often
+        return int(ties[int(rng.random() * len(ties))])
+
+    def _best_indices(self, theta, rng=None) -> np.ndarray:
+        """
+        Row-wise version of _best_index for a (draws, arms) theta matrix
+        """
+        rng = self._rng if rng is None else rng
+        best = theta.min(axis=1) if self._minimize else theta.max(axis=1)
+        is_best = theta == best[:, None]
+        choices = is_best.argmax(axis=1)
+        tied = np.flatnonzero(is_best.sum(axis=1) > 1)
+        if len(tied):
+            noise = rng.random((len(tied), theta.shape[1]))
+            noise[~is_best[tied]] = -1
+            choices[tied] = noise.argmax(axis=1)
+        return choices
+
+    @timed("choose_arm")
     def choose_arm(self):
         """
         Choose which arm to pull
 
-        Given the current posterior distributions this function will sample from
-        the posterior and find the max theta of all the available options
+        Given the current posterior distributions this function draws one theta
+        per arm in a single vectorized call and picks the max theta (min for
+        experiments that minimize) of all the available options
+        """
+        index = self._best_index(self._draw())
+        if self._metrics is not None:
+            self._metrics.record_decisions([self._store.labels[index]], [1])
+        return self._store.labels[index]
+
+    @timed("choose_arms")
+    def choose_arms(
+        self,
+        n: int,
+        as_labels: bool = True,
+        return_counts: bool = False,
+        max_samples: int = MAX_SAMPLES,
+    ):
         """
+        Makes n independent Thompson sampling decisions in one call
+
+        Draws an (n, arms) theta matrix and reduces it along the arm axis. When
+        n * arms exceeds max_samples the draws are made in chunks of rows so
+        memory stays bounded.
 
-        theta_est = {}
-        for key, _ in self.posteriors.items():
-            theta_est[key] = self._sample_posterior(1, key)
-        return max(theta_est.items(), key=operator.itemgetter(1))[0]
+        Returns a list of labels (or an array of arm indices if as_labels is
+        False). With return_counts the per-arm selection counts, ordered like
+        .posteriors, are returned as well.
+        """
+        choices = self._choose_indices(n, max_samples)
+        decisions = choices
+        if as_labels:
+            labels = self._store.labels
+            decisions = [labels[i] for i in choices]
+        if return_counts:
+            return decisions, np.bincount(choices, minlength=len(self._store))
+        return decisions
+
+    def _top_indices(self, theta, k: int) -> np.ndarray:
+        """
+        Indices of the k best entries of a theta vector, best first
+        """
+        order = theta if self._minimize else -theta
+        top = np.argpartition(order, k - 1)[:k]
+        return top[np.argsort(order[top], kind="stable")]
+
+    @timed("choose_top_k")
+    def choose_top_k(self, k: int, as_labels: bool = True):
+        """
+        Chooses a slate of k distinct arms from one posterior draw per arm
+
+        The arms are ranked by their sampled theta (ascending for experiments
+        that minimize) and the best k are returned in rank order, so the cost is
+        one vectorized draw and a partial sort whatever k is.
+        """
+        if not 1 <= k <= len(self._store):
+            raise ValueError(f"k: {k} must be between 1 and {len(self._store)}")
+        top = self._top_indices(self._draw(), k)
+        if self._metrics is not None:
+            labels = self._store.labels
+            self._metrics.record_decisions([labels[i] for i in top], [1] * k, 1)
+        if as_labels:
+            labels = self._store.labels
+            return [labels[i] for i in top]
+        return top
+
+    @timed("choose_top_two")
+    def choose_top_two(
+        self, beta: float = 0.5, max_resamples: int = 1000, as_label: bool = True
+    ):
+        """
+        Top-two Thompson sampling, for identifying the best arm
+
+        With probability beta the Thompson sampling leader is returned.
+        Otherwise posterior draws are repeated, in vectorized batches, until a
+        different arm wins and that challenger is returned; if the leader still
+        wins after max_resamples draws the runner-up of the last draw is used.
+        """
+        if not 0 <= beta <= 1:
+            raise ValueError(f"beta: {beta} must be between 0 and 1")
+        theta = self._draw()
+        leader = self._best_index(theta)
+        choice = leader
+        if len(self._store) > 1 and self._rng.random() >= beta:
+            choice = None
+            batch = 16
+            remaining = max_resamples
+            while remaining > 0 and choice is None:
+                rows = min(batch, remaining)
+                theta = self._draw(rows)
+                winners = self._best_indices(theta)
+                challengers = winners[winners != leader]
+                if len(challengers):
+                    choice = int(challengers[0])
+                remaining -= rows
+                batch *= 2
+            if choice is None:
+                choice = int(self._top_indices(theta[-1], 2)[1])
+        if self._metrics is not None:
+            self._metrics.record_decisions([self._store.labels[choice]], [1])
+        return self._store.labels[choice] if as_label else choice
+
+    def _choose_indices(
+        self,
+        n: int,
+        max_samples: int = MAX_SAMPLES,
+        params: dict = None,
+        rng=None,
+        labels: list = None,
+    ) -> np.ndarray:
+        """
+        Arm indices of n independent decisions, drawn in row chunks that keep
+        each theta matrix under max_samples elements
+
+        labels name the arms params describe, for metrics, and default to the
+        experiment's own.
+        """
+        params = self._sampling_params() if params is None else params
+        arms = len(next(iter(params.values())))
+        rows = max(1, max_samples // max(arms, 1))
+        choices = np.empty(n, dtype=np.intp)
+        for start in range(0, n, rows):
+            stop = min(start + rows, n)
+            theta = self._draw(stop - start, params, rng)
+            choices[start:stop] = self._best_indices(theta, rng)
+        if self._metrics is not None:
+            self._metrics.record_decisions(
+                self._store.labels if labels is None else labels,
+                np.bincount(choices, minlength=arms),
+            )
+        return choices
 
     def plot_posterior(self):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         plot_values = {
             key: self._sample_posterior(10000, key)
             for key, _ in self.posteriors.items()
@@ -98,3 +595,25 @@ class BaseThompsonSampling:
         plt.title("Posterior Distributions")
         plt.legend()
         plt.xlabel("Parameter Value")
+
+
+class GammaThompsonSampling(BaseThompsonSampling):
+    """
+    Storage shared by the experiments with a Gamma posterior over a rate
+
+    Each arm keeps shape and rate (one over scale) as float64 accumulators, so a
+    conjugate update is a pair of additions with no division or rounding and
+    stays exact however many rewards arrive. scale is only derived when
+    sampling and when reading .posteriors, which still shows shape and scale.
+    """
+
+    _default = {"shape": 0.001, "rate": 0.001}
+    _posterior = "gamma"
+
+    @staticmethod
+    def _stored_params(params: dict) -> dict:
+        return {"shape": params["shape"], "rate": 1 / params["scale"]}
+
+    def _sampling_params(self, params: dict = None) -> dict:
+        params = self._store.params if params is None else params
+        return {"shape": params["shape"], "scale": 1 / params["rate"]}
@@ -1,6 +1,3 @@
-from numpy.random import binomial
-from numpy import mean
-import operator
 from thompson_sampling.base import BaseThompsonSampling
 from thompson_sampling.priors import BetaPrior
 from typing import List
@@ -10,46 +7,70 @@ class BernoulliExperiment(BaseThompsonSampling):
     _default = {"a": 1, "b": 1}
     _posterior = "beta"
 
-    def __init__(self, arms: int = None, priors: BetaPrior = None, labels: list = None):
-        super().__init__(arms, priors, labels)
+    def __init__(
+        self,
+        arms: int = None,
+        priors: BetaPrior = None,
+        labels: list = None,
+        rng=None,
+    ):
+        super().__init__(arms, priors, labels, rng)
 
-    def add_rewards(self, outcomes: List[dict]):
-        """
-        Takes in a list of dictionaries with the results and updates the Posterior
-        distribution for the label.
-
-        outcomes = [{"label": "A", "reward": 1}, {"label":"B", "reward":0}]
-
-        """
+    @staticmethod
+    def _update_params(params: dict, idx, counts, totals):
+        params["a"][idx] += totals
+        params["b"][idx] += counts - totals
 
-        for result in outcomes:
-            self.posteriors[result["label"]]["a"] += result["reward"]
-            self.posteriors[result["label"]]["b"] += 1 - result["reward"]
-        return self
+    @staticmethod
+    def _mean_reward(params: dict):
+        return params["a"] / (params["a"] + params["b"])
 
-    def get_ppd(self, size) -> List[dict]:
+    def get_ppd(
+        self, size: int = None, return_samples: bool = False, analytic: bool = False
+    ) -> List[dict]:
         """
         Simulates the posterior predictive distribution for all available
         posterior distributions and provides Percentage Success & Percentage Failure.
+
+        All arms are simulated at once as an (arms, size) matrix; with
+        return_samples the matrix of simulated outcomes is returned alongside
+        the summaries, one row per arm in .posteriors order.
+
+        With analytic the summaries are computed in closed form from the
+        conjugate posterior instead of by simulation (size is then not needed),
+        and each summary also carries the arm's "Probability Best".
         """
-        ppd_stats = []
-        for k, _ in self.posteriors.items():
-            pred_outcome = [
-                int(
-                    binomial(
-                        n=1,
-                        p=self._avail_posteriors[self._posterior](
-                            size=1, **self.posteriors[k]
-                        ),
-                        size=1,
-                    )
-                )
-                for _ in range(size)
-            ]
-            summary_stats = {
+        if analytic:
+            return self._analytic_ppd()
+        if size is None:
+            raise ValueError("size is required unless analytic=True")
+        pred_outcome = self._rng.binomial(n=1, p=self._draw_per_arm(size))
+        successes = pred_outcome.sum(axis=1).tolist()
+        ppd_stats = [
+            {
                 "Label": k,
-                "Percentage - Success": sum(pred_outcome) / size,
-                "Percentage - Fail": (len(pred_outcome) - sum(pred_outcome)) / size,
+                "Percentage - Success": successes[i] / size,
+                "Percentage - Fail": (size - successes[i]) / size,
             }
-            ppd_stats.append(summary_stats)
+            for i, k in enumerate(self._store.labels)
+        ]
+        if return_samples:
+            return ppd_stats, pred_outcome
         return ppd_stats
+
+    def _analytic_ppd(self) -> List[dict]:
+        """
+        The predictive success rate of a Beta(a, b) posterior is a / (a + b)
+        """
+        a, b = self._store.params["a"], self._store.params["b"]
+        success = (a / (a + b)).tolist()
+        best = self._probability_best().tolist()
+        return [
+            {
+                "Label": k,
+                "Percentage - Success": success[i],
+                "Percentage - Fail": 1 - success[i],
+                "Probability Best": best[i],
+            }
+            for i, k in enumerate(self._store.labels)
+        ]
@@ -0,0 +1,199 @@
+import logging
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import List
+import numpy as np
+from thompson_sampling.base import BaseThompsonSampling, MAX_SAMPLES
+from thompson_sampling.metrics import timed
+from thompson_sampling.rng import ThreadLocalGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class _Snapshot:
+    """
+    Immutable posterior state published to readers
+    """
+
+    __slots__ = ("store", "params", "posteriors")
+
+    def __init__(self, experiment: BaseThompsonSampling):
+        self.store = experiment._store.copy(readonly=True)
+        self.params = experiment._sampling_params(self.store.params)
+        self.posteriors = self.store.view(experiment._sampling_params)
+
+
+class ConcurrentExperiment:
+    """
+    Thread-safe front end for sharing one experiment between threads
+
+    Decisions sample from an immutable snapshot of the posterior parameters,
+    each thread with its own random stream, so readers never take a lock.
+    Rewards are appended to a buffer and applied to the wrapped experiment in
+    one bulk update once flush_size rewards are pending, when flush_interval
+    seconds have passed, or when flush() is called; a new snapshot is then
+    published with a single reference swap.
+
+    with ConcurrentExperiment(BernoulliExperiment(arms=3), flush_interval=1) as exp:
+        label = exp.choose_arm()
+        exp.add_rewards([{"label": label, "reward": 1}])
+    """
+
+    def __init__(
+        self,
+        experiment: BaseThompsonSampling,
+        flush_size: int = 1000,
+        flush_interval: float = None,
+        seed=None,
+    ):
+        self.experiment = experiment
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._generators = ThreadLocalGenerator(seed)
+        self._lock = Lock()
+        self._labels = []
+        self._rewards = []
+        self._pending = 0
+        self._last_flush = monotonic()
+        self._snapshot = _Snapshot(experiment)
+        self._stop = Event()
+        self._flusher = None
+        if flush_interval is not None:
+            self._flusher = Thread(target=self._flush_periodically, daemon=True)
+            self._flusher.start()
+
+    @property
+    def posteriors(self):
+        """
+        Read-only view of the posteriors as of the last flush
+        """
+        return self._snapshot.posteriors
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of buffered rewards not yet applied to the posteriors
+        """
+        return self._pending
+
+    @property
+    def _metrics(self):
+        # the wrapped experiment's collector, read by @timed
+        return self.experiment._metrics
+
+    @timed("choose_arm")
+    def choose_arm(self):
+        snapshot = self._snapshot
+        rng = self._generators.get()
+        theta = self.experiment._draw(params=snapshot.params, rng=rng)
+        label = snapshot.store.labels[self.experiment._best_index(theta, rng)]
+        if self.experiment._metrics is not None:
+            self.experiment._metrics.record_decisions([label], [1])
+        return label
+
+    @timed("choose_arms")
+    def choose_arms(
+        self,
+        n: int,
+        as_labels: bool = True,
+        return_counts: bool = False,
+        max_samples: int = MAX_SAMPLES,
+    ):
+        """
+        Batched decisions from the current snapshot, see
+        BaseThompsonSampling.choose_arms
+        """
+        snapshot = self._snapshot
+        choices = self.experiment._choose_indices(
+            n,
+            max_samples,
+            snapshot.params,
+            self._generators.get(),
+            snapshot.store.labels,
+        )
+        decisions = choices
+        if as_labels:
+            labels = snapshot.store.labels
+            decisions = [labels[i] for i in choices]
+        if return_counts:
+            return decisions, np.bincount(choices, minlength=len(snapshot.store))
+        return decisions
+
+    def add_rewards(self, outcomes: List[dict]):
+        return self.add_rewards_bulk(
+            [result["label"] for result in outcomes],
+            [result["reward"] for result in outcomes],
+        )
+
+    def add_rewards_bulk(self, labels, rewards=None):
+        """
+        Buffers rewards for the next flush; see BaseThompsonSampling.add_rewards_bulk
+        """
+        if rewards is None:
+            labels, rewards = labels["label"], labels["reward"]
+        labels, rewards = np.asarray(labels), np.asarray(rewards, dtype=np.float64)
+        if labels.shape != rewards.shape:
+            raise ValueError(
+                f"labels and rewards must be the same length, got "
+                f"{labels.shape} and {rewards.shape}"
+            )
+        # fail here rather than at flush time, where the batch would be lost
+        self._snapshot.store.lookup(labels)
+        with self._lock:
+            self._labels.append(labels)
+            self._rewards.append(rewards)
+            self._pending += len(labels)
+            due = self._pending >= self.flush_size or (
+                self.flush_interval is not None
+                and monotonic() - self._last_flush >= self.flush_interval
+            )
+            if due:
+                self._flush_locked()
+        return self
+
+    def flush(self):
+        """
+        Applies every buffered reward and publishes a new snapshot
+        """
+        with self._lock:
+            self._flush_locked()
+        return self
+
+    def _flush_locked(self):
+        self._last_flush = monotonic()
+        if not self._pending:
+            return
+        labels, rewards = np.concatenate(self._labels), np.concatenate(self._rewards)
+        # rewards for arms removed since they were buffered are dropped, the
+        # rest are applied
+        store = self.experiment._store
+        uniques, inverse = np.unique(labels, return_inverse=True)
+        current = np.array([label in store for label in uniques.tolist()], bool)
+        current = current[inverse.reshape(-1)]
+        self.experiment.add_rewards_bulk(labels[current], rewards[current])
+        # cleared only once applied, so a failed update loses nothing
+        self._labels, self._rewards, self._pending = [], [], 0
+        self._snapshot = _Snapshot(self.experiment)
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # the rewards stay buffered for the next attempt
+                logger.exception("periodic flush failed")
+
+    def close(self):
+        """
+        Stops the background flusher, if any, and applies pending rewards
+        """
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,80 +1,89 @@
-from numpy.random import exponential
 from numpy import mean, percentile
-import operator
-from thompson_sampling.base import BaseThompsonSampling
+from thompson_sampling.base import GammaThompsonSampling
 from thompson_sampling.priors import GammaPrior
 from typing import List
+import numpy as np
 
 
-class ExponentialExperiment(BaseThompsonSampling):
-    _default = {"shape": 0.001, "scale": 1000}
-    _posterior = "gamma"
+class ExponentialExperiment(GammaThompsonSampling):
+    _minimize = True
 
     def __init__(
-        self, arms: int = None, priors: GammaPrior = None, labels: list = None
+        self,
+        arms: int = None,
+        priors: GammaPrior = None,
+        labels: list = None,
+        rng=None,
     ):
-        super().__init__(arms, priors, labels)
+        super().__init__(arms, priors, labels, rng)
 
-    def choose_arm(self):
-        """
-        Choose which arm to pull
-
-        Given the current posterior distributions this function will sample from
-        the posterior and find the max theta of all the available options
-        """
+    @staticmethod
+    def _update_params(params: dict, idx, counts, totals):
+        params["shape"][idx] += counts
+        params["rate"][idx] += totals
 
-        theta_est = {}
-        for key, _ in self.posteriors.items():
-            theta_est[key] = self._sample_posterior(1, key)
-        return min(theta_est.items(), key=operator.itemgetter(1))[0]
+    @staticmethod
+    def _mean_reward(params: dict):
+        # a plug-in estimate: one over the posterior mean rate
+        return 1 / (params["shape"] * params["scale"])
 
-    def add_rewards(self, outcomes: List[dict]):
+    def get_ppd(
+        self, size: int = None, return_samples: bool = False, analytic: bool = False
+    ):
         """
-        Takes in a list of dictionaries with the results and updates the Posterior
-        distribution for the label.
+        Simulates the posterior predictive distribution for a given
+        label and returns the mean, and 95% credible interval.
 
-        outcomes = [{"label": "A", "reward": 1}, {"label":"B", "reward":0}]
+        All arms are simulated at once as an (arms, size) matrix; with
+        return_samples the matrix of simulated outcomes is returned alongside
+        the summaries, one row per arm in .posteriors order.
 
+        With analytic the summaries are computed in closed form from the
+        conjugate posterior instead of by simulation (size is then not needed),
+        and each summary also carries the arm's "Probability Best".
         """
-        for result in outcomes:
-            self.posteriors[result["label"]]["shape"] += 1
-            self.posteriors[result["label"]]["scale"] = round(
-                1
-                / ((1 / self.posteriors[result["label"]]["scale"]) + result["reward"]),
-                8,
-            )
-        return self
+        if analytic:
+            return self._analytic_ppd()
+        if size is None:
+            raise ValueError("size is required unless analytic=True")
+        pred_outcome = np.floor(
+            self._rng.exponential(scale=1 / (self._draw_per_arm(size) + 1e-100))
+        )
+        lower, upper = percentile(pred_outcome, [2.5, 97.5], axis=1).tolist()
+        means = mean(pred_outcome, axis=1).tolist()
+        ppd_stats = [
+            {
+                "Label": k,
+                "95% Credible Interval": (round(lower[i], 3), round(upper[i], 3)),
+                "mean": round(means[i], 3),
+            }
+            for i, k in enumerate(self._store.labels)
+        ]
+        if return_samples:
+            return ppd_stats, pred_outcome
+        return ppd_stats
 
-    def get_ppd(self, size):
+    def _analytic_ppd(self) -> List[dict]:
         """
-        Simulates the posterior predictive distribution for a given
-        label and returns the mean, and 95% credible interval.
+        The posterior predictive of a Gamma(shape, scale) rate with exponential
+        durations is Lomax with c=shape and scale=1 / scale, whose quantiles are
+        closed form; its mean is infinite unless shape > 1
         """
-        ppd_stats = []
-        for k, _ in self.posteriors.items():
-            pred_outcome = [
-                int(
-                    exponential(
-                        scale=1
-                        / (
-                            self._avail_posteriors[self._posterior](
-                                size=1, **self.posteriors[k]
-                            )
-                            + 1e-100
-                        ),
-                        size=1,
-                    )
-                )
-                for _ in range(size)
-            ]
+        from scipy.stats import lomax
 
-            summary_stats = {
+        params = self._sampling_params()
+        shape, scale = params["shape"], params["scale"]
+        predictive = lomax(shape[:, None], scale=1 / scale[:, None])
+        lower, upper = predictive.ppf([0.025, 0.975]).T.tolist()
+        with np.errstate(divide="ignore"):
+            means = np.where(shape > 1, 1 / (scale * (shape - 1)), np.inf).tolist()
+        best = self._probability_best().tolist()
+        return [
+            {
                 "Label": k,
-                "95% Credible Interval": (
-                    round(percentile(pred_outcome, 2.5), 3),
-                    round(percentile(pred_outcome, 97.5), 3),
-                ),
-                "mean": round(mean(pred_outcome), 3),
+                "95% Credible Interval": (round(lower[i], 3), round(upper[i], 3)),
+                "mean": round(means[i], 3),
+                "Probability Best": best[i],
             }
-            ppd_stats.append(summary_stats)
-        return ppd_stats
+            for i, k in enumerate(self._store.labels)
+        ]
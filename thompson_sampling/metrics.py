@@ -0,0 +1,217 @@
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+import math
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (
+    1e-6,
+    5e-6,
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    2.5e-3,
+    5e-3,
+    1e-2,
+    5e-2,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+def timed(operation: str):
+    """
+    Decorates an experiment method so that, when a Metrics collector is
+    installed, its latency is recorded under operation
+
+    Without a collector the only cost is one attribute check per call.
+    """
+
+    def decorate(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self._metrics
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            start = perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                metrics.observe(operation, perf_counter() - start)
+
+        return wrapper
+
+    return decorate
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus style
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """
+        [(upper bound, observations <= bound)], ending with (inf, count)
+        """
+        total, result = 0, []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def as_dict(self) -> dict:
+        return {
+            "buckets": {str(bound): count for bound, count in self.cumulative()},
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class Metrics:
+    """
+    Collects latency histograms, counters and per-arm totals from the hot paths
+    of one or more experiments
+
+    metrics = experiment.instrument()
+    ...
+    metrics.as_dict()
+    metrics.to_prometheus()
+
+    Install it with BaseThompsonSampling.instrument; name, if given, is added as
+    an experiment label to every exported sample. Recording is guarded by a lock
+    so a collector can be shared by experiments used from several threads.
+    """
+
+    def __init__(self, name: str = None, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self._buckets = buckets
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = {}
+            self.decisions = 0
+            self.rewards = 0
+            self.samples = 0
+            self.selections = {}
+            self.arm_rewards = {}
+            self.arm_reward_totals = {}
+
+    def observe(self, operation: str, seconds: float):
+        with self._lock:
+            if operation not in self.latency:
+                self.latency[operation] = Histogram(self._buckets)
+            self.latency[operation].observe(seconds)
+
+    def record_samples(self, count: int):
+        with self._lock:
+            self.samples += int(count)
+
+    def record_decisions(self, labels: list, counts, decisions: int = None):
+        """
+        Adds counts[i] selections of labels[i]; decisions defaults to the number
+        of selections, but a slate of several arms is one decision
+        """
+        counts = counts.tolist() if hasattr(counts, "tolist") else list(counts)
+        with self._lock:
+            self.decisions += sum(counts) if decisions is None else decisions
+            for label, count in zip(labels, counts):
+                if count:
+                    self.selections[label] = self.selections.get(label, 0) + count
+
+    def record_rewards(self, labels: list, counts, totals):
+        counts, totals = list(map(float, counts)), list(map(float, totals))
+        with self._lock:
+            self.rewards += int(sum(counts))
+            for label, count, total in zip(labels, counts, totals):
+                self.arm_rewards[label] = self.arm_rewards.get(label, 0) + int(count)
+                self.arm_reward_totals[label] = (
+                    self.arm_reward_totals.get(label, 0.0) + total
+                )
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "latency": {k: v.as_dict() for k, v in self.latency.items()},
+                "decisions": self.decisions,
+                "rewards": self.rewards,
+                "samples": self.samples,
+                "selections": dict(self.selections),
+                "arm_rewards": dict(self.arm_rewards),
+                "arm_reward_totals": dict(self.arm_reward_totals),
+            }
+
+    def to_prometheus(self, prefix: str = "thompson_sampling") -> str:
+        """
+        The metrics in the Prometheus text exposition format
+        """
+        base = f'experiment="{_escape(self.name)}",' if self.name is not None else ""
+        snapshot = self.as_dict()
+        lines = []
+
+        def family(name, kind, help, samples):
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                labels = (base + labels).rstrip(",")
+                labels = f"{{{labels}}}" if labels else ""
+                lines.append(f"{prefix}_{name}{suffix}{labels} {_number(value)}")
+
+        for name, help in [
+            ("decisions", "Decisions made, counting a slate once"),
+            ("rewards", "Rewards applied to the posteriors"),
+            ("samples", "Posterior samples drawn"),
+        ]:
+            family(f"{name}_total", "counter", help, [("", "", snapshot[name])])
+        latency = []
+        for operation, histogram in snapshot["latency"].items():
+            operation = f'operation="{_escape(operation)}",'
+            for bound, count in histogram["buckets"].items():
+                le = "+Inf" if bound == "inf" else bound
+                latency.append(("_bucket", f'{operation}le="{le}",', count))
+            latency.append(("_sum", operation, histogram["sum"]))
+            latency.append(("_count", operation, histogram["count"]))
+        family("latency_seconds", "histogram", "Hot path latency", latency)
+        for name, key, kind, help in [
+            ("arm_selections_total", "selections", "counter", "Selections per arm"),
+            ("arm_rewards_total", "arm_rewards", "counter", "Rewards per arm"),
+            ("arm_reward_sum", "arm_reward_totals", "counter", "Reward sum per arm"),
+        ]:
+            samples = [
+                ("", f'arm="{_escape(label)}",', value)
+                for label, value in snapshot[key].items()
+            ]
+            family(name, kind, help, samples)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,305 @@
+from math import ceil, log
+from time import time
+from typing import List
+import numpy as np
+from thompson_sampling.base import BaseThompsonSampling, MAX_SAMPLES
+
+# Largest exponent the discount reference clock may drift by before the scaled
+# statistics are renormalized, keeping them far from float64 overflow
+_MAX_EXPONENT = 50.0
+
+
+class _ForgettingExperiment:
+    """
+    Shared machinery for experiments whose posteriors forget old rewards
+
+    The wrapped experiment's parameters at construction are kept as the prior.
+    Rewards only update per-arm counts and reward sums held by the wrapper,
+    and the experiment's posteriors are rebuilt as prior plus the current
+    effective statistics - one vectorized pass - the next time they are read.
+
+    Arms added to or removed from the wrapped experiment are picked up on the
+    next call: a new arm's parameters at that point become its prior, and the
+    statistics of the remaining arms follow them to their new positions.
+    """
+
+    def __init__(self, experiment: BaseThompsonSampling, by: str):
+        if by not in ("events", "time"):
+            raise ValueError(f"by must be 'events' or 'time', got {by!r}")
+        self.experiment = experiment
+        self.by = by
+        self._labels = list(experiment._store.labels)
+        self._prior = {k: v.copy() for k, v in experiment._store.params.items()}
+        self._all = np.arange(len(self._labels))
+        self._clock = 0.0
+        self._events = 0
+        self._stale = False
+
+    def _statistics(self):
+        """
+        Effective (counts, totals) for every arm at the current clock
+        """
+        raise NotImplementedError
+
+    def _record(self, idx, clocks, rewards):
+        """
+        Folds rows with arm indices idx, clock values and rewards into the
+        statistics
+        """
+        raise NotImplementedError
+
+    def _remap(self, rows: np.ndarray, new: np.ndarray):
+        """
+        Reorders the statistics to the experiment's arms, where arm i was arm
+        rows[i] before and arms flagged in new start without rewards
+        """
+        raise NotImplementedError
+
+    def _sync(self):
+        """
+        Follows arms added to or removed from the wrapped experiment
+        """
+        labels = self.experiment._store.labels
+        if labels == self._labels:
+            return
+        previous = dict(zip(self._labels, range(len(self._labels))))
+        rows = np.array([previous.get(label, -1) for label in labels], dtype=np.intp)
+        new = rows < 0
+        params = self.experiment._store.params
+        self._prior = {
+            name: np.where(new, params[name], values[rows])
+            for name, values in self._prior.items()
+        }
+        self._remap(rows, new)
+        self._labels = list(labels)
+        self._all = np.arange(len(labels))
+        self._stale = True
+
+    @property
+    def current(self) -> BaseThompsonSampling:
+        """
+        The wrapped experiment, with posteriors brought up to date
+        """
+        self._sync()
+        if self._stale:
+            params = self.experiment._store.params
+            for name, values in self._prior.items():
+                params[name][:] = values
+            counts, totals = self._statistics()
+            self.experiment._update_params(params, self._all, counts, totals)
+            self._stale = False
+        return self.experiment
+
+    @property
+    def posteriors(self):
+        return self.current.posteriors
+
+    def choose_arm(self):
+        return self.current.choose_arm()
+
+    def choose_arms(
+        self,
+        n: int,
+        as_labels: bool = True,
+        return_counts: bool = False,
+        max_samples: int = MAX_SAMPLES,
+    ):
+        return self.current.choose_arms(n, as_labels, return_counts, max_samples)
+
+    def choose_top_k(self, k: int, as_labels: bool = True):
+        return self.current.choose_top_k(k, as_labels)
+
+    def choose_top_two(self, *args, **kwargs):
+        return self.current.choose_top_two(*args, **kwargs)
+
+    def get_ppd(self, *args, **kwargs):
+        return self.current.get_ppd(*args, **kwargs)
+
+    def add_arm(self, label, params: dict = None):
+        self.current.add_arm(label, params)
+        return self
+
+    def remove_arm(self, label):
+        self.current.remove_arm(label)
+        return self
+
+    def retire_dominated_arms(self, *args, **kwargs) -> list:
+        return self.current.retire_dominated_arms(*args, **kwargs)
+
+    def advance(self, now: float):
+        """
+        Moves the clock forward to now (a timestamp in time mode, an event count
+        in events mode) without adding rewards, so idle arms keep forgetting
+
+        In events mode the next reward added is numbered now.
+        """
+        if self.by == "events":
+            self._events = max(self._events, ceil(now))
+        if now > self._clock:
+            self._record(
+                np.empty(0, dtype=np.intp), np.array([float(now)]), np.empty(0)
+            )
+            self._stale = True
+        return self
+
+    def add_rewards(self, outcomes: List[dict], timestamps=None):
+        return self.add_rewards_bulk(
+            [result["label"] for result in outcomes],
+            [result["reward"] for result in outcomes],
+            timestamps,
+        )
+
+    def add_rewards_bulk(self, labels, rewards=None, timestamps=None):
+        """
+        Adds rewards in arrival order; see BaseThompsonSampling.add_rewards_bulk
+
+        In time mode each row is stamped with timestamps (seconds, one per row
+        or a single value) and defaults to the current time.
+        """
+        if rewards is None:
+            labels, rewards = labels["label"], labels["reward"]
+        rewards = np.asarray(rewards, dtype=np.float64)
+        self._sync()
+        idx = self.experiment._store.lookup(labels)
+        if idx.shape != rewards.shape:
+            raise ValueError(
+                f"labels and rewards must be the same length, got "
+                f"{idx.shape} and {rewards.shape}"
+            )
+        if self.by == "events":
+            clocks = np.arange(
+                self._events, self._events + len(rewards), dtype=np.float64
+            )
+            self._events += len(rewards)
+        else:
+            stamps = time() if timestamps is None else timestamps
+            clocks = np.broadcast_to(np.asarray(stamps, dtype=np.float64), idx.shape)
+        if len(idx):
+            self._record(idx, clocks, rewards)
+            self._stale = True
+        return self
+
+
+class DiscountedExperiment(_ForgettingExperiment):
+    """
+    Exponentially discounted posteriors for drifting reward rates
+
+    Every reward's weight decays by discount per later event (by="events") or
+    halves every half_life seconds (by="time"), so the posterior tracks recent
+    traffic without replaying history.
+
+    Updates only touch the arms that received rewards: statistics are stored
+    inflated by exp(rate * (clock - reference)) so that decaying everything is a
+    change of one scalar, and they are renormalized only when that factor grows
+    large.
+
+    exp = DiscountedExperiment(BernoulliExperiment(arms=3), discount=0.999)
+    """
+
+    def __init__(
+        self,
+        experiment: BaseThompsonSampling,
+        discount: float = None,
+        half_life: float = None,
+        by: str = "events",
+    ):
+        super().__init__(experiment, by)
+        if (discount is None) == (half_life is None):
+            raise ValueError("Specify exactly one of discount or half_life")
+        if discount is not None and not 0 < discount <= 1:
+            raise ValueError(f"discount: {discount} must be in (0, 1]")
+        if half_life is not None and half_life <= 0:
+            raise ValueError(f"half_life: {half_life} must be positive")
+        self.rate = -log(discount) if discount is not None else log(2) / half_life
+        self._reference = 0.0
+        self._counts = np.zeros(len(self._all))
+        self._totals = np.zeros(len(self._all))
+
+    def _statistics(self):
+        scale = np.exp(-self.rate * (self._clock - self._reference))
+        return self._counts * scale, self._totals * scale
+
+    def _record(self, idx, clocks, rewards):
+        self._clock = max(self._clock, float(clocks.max()))
+        if self.rate * (self._clock - self._reference) > _MAX_EXPONENT:
+            self._counts, self._totals = self._statistics()
+            self._reference = self._clock
+        weights = np.exp(self.rate * (clocks[: len(idx)] - self._reference))
+        arms, rows = np.unique(idx, return_inverse=True)
+        self._counts[arms] += np.bincount(rows, weights=weights)
+        self._totals[arms] += np.bincount(rows, weights=weights * rewards)
+
+    def _remap(self, rows, new):
+        self._counts = np.where(new, 0.0, self._counts[rows])
+        self._totals = np.where(new, 0.0, self._totals[rows])
+
+
+class SlidingWindowExperiment(_ForgettingExperiment):
+    """
+    Posteriors built from only the most recent window of rewards
+
+    The window is split into buckets, measured in events (by="events") or
+    seconds (by="time"). Each bucket keeps its own per-arm statistics; when
+    the clock moves into a new bucket the expired one is subtracted from the
+    running totals, so history never has to be replayed. The effective window
+    is between window - window / buckets and window long.
+
+    exp = SlidingWindowExperiment(PoissonExperiment(arms=3), window=86400, by="time")
+    """
+
+    def __init__(
+        self,
+        experiment: BaseThompsonSampling,
+        window: float,
+        buckets: int = 10,
+        by: str = "events",
+    ):
+        super().__init__(experiment, by)
+        if window <= 0 or buckets < 1:
+            raise ValueError("window must be positive and buckets at least 1")
+        self.window = window
+        self.buckets = buckets
+        self.width = window / buckets
+        arms = len(self._all)
+        self._bucket_counts = np.zeros((buckets, arms))
+        self._bucket_totals = np.zeros((buckets, arms))
+        self._counts = np.zeros(arms)
+        self._totals = np.zeros(arms)
+        self._bucket = 0
+
+    def _statistics(self):
+        # running totals are kept by subtraction, so clip float round-off
+        return np.maximum(self._counts, 0), np.maximum(self._totals, 0)
+
+    def _expire(self, bucket: int):
+        """
+        Advances the newest bucket to bucket, dropping every bucket that leaves
+        the window
+        """
+        if bucket <= self._bucket:
+            return
+        expired = range(max(self._bucket + 1, bucket - self.buckets + 1), bucket + 1)
+        slots = [b % self.buckets for b in expired]
+        self._counts -= self._bucket_counts[slots].sum(axis=0)
+        self._totals -= self._bucket_totals[slots].sum(axis=0)
+        self._bucket_counts[slots] = 0
+        self._bucket_totals[slots] = 0
+        self._bucket = bucket
+
+    def _record(self, idx, clocks, rewards):
+        self._clock = max(self._clock, float(clocks.max()))
+        bucket_ids = np.floor(clocks[: len(idx)] / self.width).astype(np.int64)
+        self._expire(int(np.floor(self._clock / self.width)))
+        live = bucket_ids > self._bucket - self.buckets
+        idx, rewards, slots = idx[live], rewards[live], bucket_ids[live] % self.buckets
+        np.add.at(self._bucket_counts, (slots, idx), 1)
+        np.add.at(self._bucket_totals, (slots, idx), rewards)
+        arms, rows = np.unique(idx, return_inverse=True)
+        self._counts[arms] += np.bincount(rows)
+        self._totals[arms] += np.bincount(rows, weights=rewards)
+
+    def _remap(self, rows, new):
+        self._counts = np.where(new, 0.0, self._counts[rows])
+        self._totals = np.where(new, 0.0, self._totals[rows])
+        self._bucket_counts = np.where(new, 0.0, self._bucket_counts[:, rows])
+        self._bucket_totals = np.where(new, 0.0, self._bucket_totals[:, rows])
@@ -0,0 +1,209 @@
+from time import monotonic
+import numpy as np
+from thompson_sampling.base import BaseThompsonSampling, MAX_SAMPLES
+
+_IMPUTATIONS = (None, "mean", "zero")
+
+
+class PendingExperiment:
+    """
+    Tracks decisions whose rewards arrive later and joins them by decision id
+
+    Every decision gets a sequential integer id; join(ids, rewards) applies the
+    rewards of any batch of ids in one bulk update. Pulls live in flat arrays
+    indexed by id - an arm code and a timestamp, 13 bytes each - and those
+    older than ttl seconds are evicted, so memory is bounded by the traffic
+    of one ttl window.
+
+    With impute, decisions account for pulls still waiting for a reward, so
+    a burst of traffic does not all pile onto the arm that happened to look
+    best: "mean" fills each pending pull in with its arm's expected reward,
+    which tightens that arm's posterior, and "zero" counts it as a zero reward,
+    the pessimistic choice that actively spreads traffic until rewards return.
+
+    exp = PendingExperiment(BernoulliExperiment(arms=3), ttl=600, impute="zero")
+    decision_id, label = exp.choose_arm()
+    ...
+    exp.join([decision_id], [1])
+    """
+
+    def __init__(
+        self,
+        experiment: BaseThompsonSampling,
+        ttl: float = 3600,
+        impute: str = None,
+        clock=monotonic,
+    ):
+        if impute not in _IMPUTATIONS:
+            raise ValueError(f"impute must be one of {_IMPUTATIONS}, got {impute!r}")
+        if ttl <= 0:
+            raise ValueError(f"ttl: {ttl} must be positive")
+        self.experiment = experiment
+        self.ttl = ttl
+        self.impute = impute
+        self._clock = clock
+        # arms are recorded as codes into _known, which only ever grows, so
+        # adding or removing arms never invalidates pending pulls
+        self._known = []
+        self._code = {}
+        self._labels = None
+        self._codes = np.empty(0, dtype=np.int32)
+        self._pending = np.zeros(0)
+        self._arms = np.empty(0, dtype=np.int32)
+        self._times = np.empty(0)
+        self._open = np.empty(0, dtype=bool)
+        self._base = 0
+        self._head = 0
+        self._size = 0
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of decisions still waiting for their reward
+        """
+        return int(self._pending.sum())
+
+    @property
+    def pending_by_arm(self) -> dict:
+        return {
+            label: int(self._pending[code])
+            for code, label in enumerate(self._known)
+            if self._pending[code]
+        }
+
+    @property
+    def posteriors(self):
+        return self.experiment.posteriors
+
+    def _arm_codes(self) -> np.ndarray:
+        """
+        Code of every arm of the experiment, in the experiment's arm order
+        """
+        labels = self.experiment._store.labels
+        if labels != self._labels:
+            for label in labels:
+                if label not in self._code:
+                    self._code[label] = len(self._known)
+                    self._known.append(label)
+            self._pending = np.concatenate(
+                [self._pending, np.zeros(len(self._known) - len(self._pending))]
+            )
+            self._codes = np.array([self._code[label] for label in labels], np.int32)
+            self._labels = list(labels)
+        return self._codes
+
+    def _sampling_params(self, codes: np.ndarray):
+        """
+        Sampling parameters with pending pulls imputed, or None when decisions
+        should use the experiment's own posteriors
+        """
+        pending = self._pending[codes]
+        idx = np.flatnonzero(pending)
+        if self.impute is None or not len(idx):
+            return None
+        experiment = self.experiment
+        params = {k: v.copy() for k, v in experiment._store.params.items()}
+        counts = pending[idx]
+        if self.impute == "mean":
+            totals = (
+                counts * experiment._mean_reward(experiment._sampling_params())[idx]
+            )
+        else:
+            totals = np.zeros(len(idx))
+        experiment._update_params(params, idx, counts, totals)
+        return experiment._sampling_params(params)
+
+    def _record(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Stores new pulls and returns their decision ids
+        """
+        n = len(codes)
+        if self._size + n > len(self._arms):
+            live = slice(self._head, self._size)
+            capacity = max(8, 2 * (self._size - self._head + n))
+            for name in ("_arms", "_times", "_open"):
+                old = getattr(self, name)
+                new = np.empty(capacity, dtype=old.dtype)
+                new[: live.stop - live.start] = old[live]
+                setattr(self, name, new)
+            self._base += self._head
+            self._size -= self._head
+            self._head = 0
+        stop = self._size + n
+        self._arms[self._size : stop] = codes
+        self._times[self._size : stop] = self._clock()
+        self._open[self._size : stop] = True
+        ids = np.arange(self._base + self._size, self._base + stop)
+        self._size = stop
+        self._pending += np.bincount(codes, minlength=len(self._pending))
+        return ids
+
+    def expire(self) -> int:
+        """
+        Forgets pulls older than ttl that never got a reward, returning how many
+        """
+        cutoff = self._clock() - self.ttl
+        head = self._head
+        stop = head + int(
+            np.searchsorted(self._times[head : self._size], cutoff, side="right")
+        )
+        expired = self._arms[head:stop][self._open[head:stop]]
+        self._pending -= np.bincount(expired, minlength=len(self._pending))
+        self._head = stop
+        return len(expired)
+
+    def choose_arm(self):
+        """
+        Returns (decision_id, label) for one decision
+        """
+        self.expire()
+        codes = self._arm_codes()
+        experiment = self.experiment
+        theta = experiment._draw(params=self._sampling_params(codes))
+        index = experiment._best_index(theta)
+        (decision_id,) = self._record(codes[index : index + 1]).tolist()
+        return decision_id, self._labels[index]
+
+    def choose_arms(self, n: int, max_samples: int = MAX_SAMPLES):
+        """
+        Returns (decision_ids, labels) for n decisions made from one posterior
+        """
+        self.expire()
+        codes = self._arm_codes()
+        choices = self.experiment._choose_indices(
+            n, max_samples, params=self._sampling_params(codes)
+        )
+        return self._record(codes[choices]), [self._labels[i] for i in choices]
+
+    def join(self, ids, rewards) -> int:
+        """
+        Applies the rewards of decisions ids in one bulk update
+
+        Ids that are unknown, expired, already joined or whose arm has since
+        been removed are skipped. Returns the number of rewards applied.
+        """
+        self.expire()
+        positions = np.asarray(ids, dtype=np.int64) - self._base
+        rewards = np.asarray(rewards, dtype=np.float64)
+        if positions.shape != rewards.shape:
+            raise ValueError(
+                f"ids and rewards must be the same length, got "
+                f"{positions.shape} and {rewards.shape}"
+            )
+        live = (positions >= self._head) & (positions < self._size)
+        positions, rewards = positions[live], rewards[live]
+        # the first reward reported for a decision wins
+        positions, first = np.unique(positions, return_index=True)
+        rewards = rewards[first]
+        keep = self._open[positions]
+        positions, rewards = positions[keep], rewards[keep]
+        self._open[positions] = False
+        codes = self._arms[positions]
+        self._pending -= np.bincount(codes, minlength=len(self._pending))
+
+        store = self.experiment._store
+        labels = np.array(self._known, dtype=object)[codes]
+        current = np.fromiter((label in store for label in labels), bool, len(labels))
+        if current.any():
+            self.experiment.add_rewards_bulk(labels[current].tolist(), rewards[current])
+        return int(current.sum())
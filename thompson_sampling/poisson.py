@@ -1,61 +1,81 @@
 from typing import List
-from numpy.random import poisson
 from numpy import mean, percentile
-import operator
-from thompson_sampling.base import BaseThompsonSampling
+from thompson_sampling.base import GammaThompsonSampling
 from thompson_sampling.priors import GammaPrior
 
 
-class PoissonExperiment(BaseThompsonSampling):
-    _default = {"shape": 0.001, "scale": 1000}
-    _posterior = "gamma"
-
+class PoissonExperiment(GammaThompsonSampling):
     def __init__(
-        self, arms: int = None, priors: GammaPrior = None, labels: list = None
+        self,
+        arms: int = None,
+        priors: GammaPrior = None,
+        labels: list = None,
+        rng=None,
     ):
-        super().__init__(arms, priors, labels)
+        super().__init__(arms, priors, labels, rng)
 
-    def add_rewards(self, outcomes: List[dict]):
-        """
-        Takes in a list of dictionaries with the results and updates the Posterior
-        distribution for the label.
+    @staticmethod
+    def _update_params(params: dict, idx, counts, totals):
+        params["shape"][idx] += totals
+        params["rate"][idx] += counts
 
-        outcomes = [{"label": "A", "reward": 1}, {"label":"B", "reward":0}]
+    @staticmethod
+    def _mean_reward(params: dict):
+        return params["shape"] * params["scale"]
 
-        """
-        for result in outcomes:
-            self.posteriors[result["label"]]["shape"] += result["reward"]
-            self.posteriors[result["label"]]["scale"] = round(
-                1 / (1 / self.posteriors[result["label"]]["scale"] + 1), 4
-            )
-        return self
-
-    def get_ppd(self, size):
+    def get_ppd(
+        self, size: int = None, return_samples: bool = False, analytic: bool = False
+    ):
         """
         Simulates the posterior predictive distribution for a given
         label and returns the mean, and 95% credible interval.
+
+        All arms are simulated at once as an (arms, size) matrix; with
+        return_samples the matrix of simulated outcomes is returned alongside
+        the summaries, one row per arm in .posteriors order.
+
+        With analytic the summaries are computed in closed form from the
+        conjugate posterior instead of by simulation (size is then not needed),
+        and each summary also carries the arm's "Probability Best".
         """
-        ppd_stats = []
-        for k, _ in self.posteriors.items():
-            pred_outcome = [
-                int(
-                    poisson(
-                        lam=self._avail_posteriors[self._posterior](
-                            size=1, **self.posteriors[k]
-                        ),
-                        size=1,
-                    )
-                )
-                for _ in range(size)
-            ]
-
-            summary_stats = {
+        if analytic:
+            return self._analytic_ppd()
+        if size is None:
+            raise ValueError("size is required unless analytic=True")
+        pred_outcome = self._rng.poisson(lam=self._draw_per_arm(size))
+        lower, upper = percentile(pred_outcome, [2.5, 97.5], axis=1).tolist()
+        means = mean(pred_outcome, axis=1).tolist()
+        ppd_stats = [
+            {
                 "Label": k,
-                "95% Credible Interval": (
-                    round(percentile(pred_outcome, 2.5), 3),
-                    round(percentile(pred_outcome, 97.5), 3),
-                ),
-                "mean": round(mean(pred_outcome), 3),
+                "95% Credible Interval": (round(lower[i], 3), round(upper[i], 3)),
+                "mean": round(means[i], 3),
             }
-            ppd_stats.append(summary_stats)
+            for i, k in enumerate(self._store.labels)
+        ]
+        if return_samples:
+            return ppd_stats, pred_outcome
         return ppd_stats
+
+    def _analytic_ppd(self) -> List[dict]:
+        """
+        The posterior predictive of a Gamma(shape, scale) rate with Poisson
+        counts is negative binomial with n=shape and p=1 / (1 + scale)
+        """
+        from scipy.stats import nbinom
+
+        params = self._sampling_params()
+        shape, scale = params["shape"], params["scale"]
+        predictive = nbinom(shape[:, None], 1 / (1 + scale[:, None]))
+        lower, upper = predictive.ppf([0.025, 0.975]).T.tolist()
+        means = (shape * scale).tolist()
+        best = self._probability_best().tolist()
+        return [
+            {
+                "Label": k,
+                "95% Credible Interval": (round(lower[i], 3), round(upper[i], 3)),
+                "mean": round(means[i], 3),
+                "Probability Best": best[i],
+            }
+            for i, k in enumerate(self._store.labels)
+        ]
@@ -1,52 +1,56 @@
-from typing import List
+import numpy as np
 from thompson_sampling.base import BasePrior
-from pandas import isna
 
 # TODO build out functionality to add priors
 
 
 class BetaPrior(BasePrior):
+    _params = ("a", "b")
+
     def __init__(self):
         """
         Initializes a prior distribution object
         """
         super().__init__()
 
-    def _param_calculator(self, mean: float, variance: float, effective_size: int):
+    def _param_arrays(self, means, variances, effective_sizes):
         """
-        Hidden method that creates the beta prior given specifications
+        Hidden method that creates the beta priors given specifications
         """
-        if mean >= 1 or mean <= 0:
-            raise ValueError(f"mean:{mean} must be in (0,1)")
-        if variance <= 0 or variance >= 0.5 ** 2 or variance >= (mean * (1 - mean)):
-            raise ValueError(
-                f"variance: {variance} must be in (0,{round(min([0.25, mean*(1-mean)]), 3)})"
-            )
-        if effective_size <= 0:
-            raise ValueError(f"effective_size: {effective_size} must be greater then 0")
-        alpha = round((((1 - mean) / variance) - (1 / mean)) * (mean ** 2), 3)
-        beta = round(alpha * (1 / mean - 1), 3)
-        ratio = effective_size / (alpha + beta)  # effective_size = beta+alpha
-        return {"a": round(alpha * ratio), "b": round(beta * ratio)}
+        invalid = {
+            "mean must be in (0,1)": ~((means > 0) & (means < 1)),
+            "variance must be in (0,min(0.25,mean*(1-mean)))": ~(
+                (variances > 0)
+                & (variances < 0.5 ** 2)
+                & (variances < means * (1 - means))
+            ),
+            "effective_size must be greater then 0": ~(effective_sizes > 0),
+        }
+        alpha = np.round((((1 - means) / variances) - (1 / means)) * (means ** 2), 3)
+        beta = np.round(alpha * (1 / means - 1), 3)
+        ratio = effective_sizes / (alpha + beta)  # effective_size = beta+alpha
+        return {"a": np.round(alpha * ratio), "b": np.round(beta * ratio)}, invalid
 
 
 class GammaPrior(BasePrior):
+    _params = ("shape", "scale")
+
     def __init__(self):
         super().__init__()
 
-    def _param_calculator(self, mean, variance: None, effective_size: None):
-        if not isna(variance):
-            if any([mean <= 0, variance <= 0]):
-                raise ValueError("Parameters must be positive")
-            rate = mean / variance
-            shape = mean ** 2 / variance
-            scale = 1 / rate
-        if not isna(effective_size) and (isna(variance)):
-            if any([mean <= 0, effective_size <= 0]):
-                raise ValueError("Parameters must be positive")
-            rate = effective_size
-            shape = mean * effective_size
-            scale = 1 / rate
-        elif all([isna(variance), isna(effective_size)]):
-            raise ValueError("Must specify either variance or effective size")
-        return {"shape": round(shape, 3), "scale": round(scale, 3)}
+    def _param_arrays(self, means, variances, effective_sizes):
+        has_variance = ~np.isnan(variances)
+        has_size = ~np.isnan(effective_sizes) & ~has_variance
+        positive = (means > 0) & np.where(
+            has_variance, variances > 0, effective_sizes > 0
+        )
+        invalid = {
+            "Parameters must be positive": (has_variance | has_size) & ~positive,
+            "Must specify either variance or effective size": ~(
+                has_variance | has_size
+            ),
+        }
+        # variance given: rate = mean / variance, otherwise rate = effective_size
+        shape = np.where(has_variance, means ** 2 / variances, means * effective_sizes)
+        scale = np.where(has_variance, variances / means, 1 / effective_sizes)
+        return {"shape": np.round(shape, 3), "scale": np.round(scale, 3)}, invalid
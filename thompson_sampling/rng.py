@@ -0,0 +1,38 @@
+from threading import Lock, local
+from typing import List
+from numpy.random import Generator, SeedSequence, default_rng
+
+
+def spawn_generators(seed=None, n: int = 1) -> List[Generator]:
+    """
+    Creates n statistically independent Generators from one seed
+
+    Children are spawned through SeedSequence, so handing one to each worker
+    thread or process gives reproducible streams that never overlap. seed may
+    be an int, a SeedSequence or None for fresh OS entropy.
+    """
+    if not isinstance(seed, SeedSequence):
+        seed = SeedSequence(seed)
+    return [default_rng(child) for child in seed.spawn(n)]
+
+
+class ThreadLocalGenerator:
+    """
+    Hands every thread its own Generator spawned from a shared SeedSequence
+
+    Generators are not safe to share between threads without serializing on
+    their internal lock, so concurrent samplers should call .get() on each use.
+    """
+
+    def __init__(self, seed=None):
+        self._seed = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        self._spawn_lock = Lock()
+        self._local = local()
+
+    def get(self) -> Generator:
+        rng = getattr(self._local, "rng", None)
+        if rng is None:
+            with self._spawn_lock:
+                (child,) = self._seed.spawn(1)
+            rng = self._local.rng = default_rng(child)
+        return rng
@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from thompson_sampling.base import BasePrior, BaseThompsonSampling
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.exponential import ExponentialExperiment
+from thompson_sampling.poisson import PoissonExperiment
+from thompson_sampling.rng import spawn_generators
+
+# Draws a reward for every chosen arm given its true parameter
+ENVIRONMENTS = {
+    BernoulliExperiment: lambda rng, theta: (rng.random(theta.shape) < theta) * 1.0,
+    PoissonExperiment: lambda rng, theta: rng.poisson(theta) * 1.0,
+    ExponentialExperiment: lambda rng, theta: rng.exponential(1 / theta),
+}
+
+
+class SimulationResult:
+    """
+    Outcome of simulate
+
+    regret[t] is the mean cumulative regret over replications after step t,
+    shares[t, i] the fraction of step t's pulls that went to arm i and
+    final_regret the cumulative regret of each replication at the horizon.
+    """
+
+    def __init__(self, labels: list, regret, shares, final_regret):
+        self.labels = labels
+        self.regret = np.asarray(regret)
+        self.shares = np.asarray(shares)
+        self.final_regret = np.asarray(final_regret)
+
+    def __repr__(self) -> str:
+        return (
+            f"SimulationResult(replications={len(self.final_regret)}, "
+            f"horizon={len(self.regret)}, regret={self.regret[-1]:g})"
+        )
+
+    @classmethod
+    def merge(cls, results: list) -> "SimulationResult":
+        """
+        Combines results for disjoint sets of replications of the same study
+        """
+        weights = np.array([len(result.final_regret) for result in results])
+        weights = weights / weights.sum()
+        return cls(
+            results[0].labels,
+            sum(w * result.regret for w, result in zip(weights, results)),
+            sum(w * result.shares for w, result in zip(weights, results)),
+            np.concatenate([result.final_regret for result in results]),
+        )
+
+
+def _environment(experiment_class: type):
+    for cls, environment in ENVIRONMENTS.items():
+        if issubclass(experiment_class, cls):
+            return environment
+    raise TypeError(f"No simulated environment for {experiment_class.__name__}")
+
+
+def simulate(
+    experiment_class: type,
+    truth,
+    horizon: int = None,
+    replications: int = 1000,
+    batch_size: int = 1,
+    priors: BasePrior = None,
+    discount: float = None,
+    seed=None,
+    workers: int = 1,
+) -> SimulationResult:
+    """
+    Runs many independent Thompson sampling experiments against known truth
+
+    truth holds every arm's true value of the parameter the experiment's
+    posterior describes - success probability, Poisson mean or exponential rate
+    - either as one row or as a (horizon, arms) array for reward rates that
+    drift. Each of the horizon steps makes batch_size decisions per replication
+    from one (replications, batch_size, arms) posterior draw and then applies
+    their rewards, so the whole study advances as one vectorized array
+    operation per step. priors are shared by every replication; with discount,
+    every reward's weight decays by discount per later reward, as in
+    thompson_sampling.nonstationary.DiscountedExperiment with by="events": a
+    step scales the accumulated rewards by discount ** batch_size and weights
+    its own batch in order, the last reward at full weight.
+
+    workers > 1 splits the replications between processes, each with an
+    independent random stream spawned from seed.
+
+    result = simulate(BernoulliExperiment, [0.04, 0.05], horizon=1000,
+                      replications=10000, priors=my_priors)
+    """
+    truth = np.atleast_2d(np.asarray(truth, dtype=np.float64))
+    horizon = len(truth) if horizon is None else horizon
+    if len(truth) not in (1, horizon):
+        raise ValueError(f"truth has {len(truth)} rows for a horizon of {horizon}")
+    if workers > 1:
+        shards = [len(s) for s in np.array_split(np.arange(replications), workers)]
+        args = (horizon, batch_size, priors, discount)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_simulate, experiment_class, truth, size, *args, rng)
+                for size, rng in zip(shards, spawn_generators(seed, workers))
+                if size
+            ]
+            return SimulationResult.merge([future.result() for future in futures])
+    rng = np.random.default_rng(seed)
+    return _simulate(
+        experiment_class,
+        truth,
+        replications,
+        horizon,
+        batch_size,
+        priors,
+        discount,
+        rng,
+    )
+
+
+def _simulate(
+    experiment_class, truth, replications, horizon, batch_size, priors, discount, rng
+) -> SimulationResult:
+    if not (
+        isinstance(experiment_class, type)
+        and issubclass(experiment_class, BaseThompsonSampling)
+    ):
+        raise TypeError(f"{experiment_class!r} is not an experiment class")
+    environment = _environment(experiment_class)
+    template = experiment_class(truth.shape[1], priors, rng=rng)
+    arms = len(template._store)
+    if truth.shape[1] != arms:
+        raise ValueError(f"truth has {truth.shape[1]} arms, the priors {arms}")
+    prior = {
+        name: np.tile(values, replications)
+        for name, values in template._store.params.items()
+    }
+    cells = replications * arms
+    counts, totals = np.zeros(cells), np.zeros(cells)
+    offsets = (np.arange(replications) * arms)[:, None]
+    if discount is not None:
+        decay = discount**batch_size
+        weights = np.broadcast_to(
+            discount ** np.arange(batch_size - 1, -1, -1.0), (replications, batch_size)
+        ).ravel()
+
+    regret = np.empty(horizon)
+    shares = np.empty((horizon, arms))
+    cumulative = np.zeros(replications)
+    for t in range(horizon):
+        theta_true = truth[t if len(truth) > 1 else 0]
+        best = theta_true.min() if template._minimize else theta_true.max()
+        params = {name: values.copy() for name, values in prior.items()}
+        template._update_params(params, slice(None), counts, totals)
+        params = {
+            name: values.reshape(replications, 1, arms)
+            for name, values in template._sampling_params(params).items()
+        }
+        theta = getattr(rng, template._posterior)(
+            size=(replications, batch_size, arms), **params
+        )
+        choices = template._best_indices(theta.reshape(-1, arms), rng).reshape(
+            replications, batch_size
+        )
+        rewards = environment(rng, theta_true[choices])
+        cumulative += np.abs(theta_true[choices] - best).sum(axis=1)
+        regret[t] = cumulative.mean()
+        shares[t] = np.bincount(choices.ravel(), minlength=arms) / choices.size
+
+        pulled = (offsets + choices).ravel()
+        if discount is None:
+            counts += np.bincount(pulled, minlength=cells)
+            totals += np.bincount(pulled, weights=rewards.ravel(), minlength=cells)
+        else:
+            counts *= decay
+            totals *= decay
+            counts += np.bincount(pulled, weights=weights, minlength=cells)
+            totals += np.bincount(
+                pulled, weights=weights * rewards.ravel(), minlength=cells
+            )
+    return SimulationResult(template._store.labels, regret, shares, cumulative)
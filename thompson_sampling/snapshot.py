@@ -0,0 +1,210 @@
+from importlib import import_module
+import json
+import os
+import struct
+import tempfile
+import numpy as np
+from thompson_sampling.base import BaseThompsonSampling
+from thompson_sampling.store import PosteriorStore
+
+MAGIC = b"TSSNAP01"
+FORMAT_VERSION = 1
+# Sections start on cache-line boundaries so they can be memory-mapped directly
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sQ")
+_LABEL_SEPARATOR = "\x00"
+_BUNDLED = (
+    "thompson_sampling.bernoulli",
+    "thompson_sampling.exponential",
+    "thompson_sampling.poisson",
+)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _encode_labels(labels: list):
+    if all(isinstance(label, str) for label in labels):
+        if any(_LABEL_SEPARATOR in label for label in labels):
+            raise ValueError("Labels containing NUL characters cannot be saved")
+        return "str", _LABEL_SEPARATOR.join(labels).encode("utf-8")
+    if all(isinstance(label, (int, np.integer)) for label in labels):
+        return "int", np.asarray(labels, dtype="<i8").tobytes()
+    raise TypeError("Only experiments whose labels are all str or all int can be saved")
+
+
+def _decode_labels(kind: str, blob: bytes, arms: int) -> list:
+    if not arms:
+        return []
+    if kind == "str":
+        return blob.decode("utf-8").split(_LABEL_SEPARATOR)
+    return np.frombuffer(blob, dtype="<i8").tolist()
+
+
+def save(experiment: BaseThompsonSampling, path, metadata: dict = None) -> None:
+    """
+    Writes the experiment's labels and posterior parameter arrays to path
+
+    The file is a fixed prefix (magic bytes and header length), a JSON header
+    describing the experiment class and where each section lives, a label
+    table and one little-endian float64 array per posterior parameter, each
+    section aligned to ALIGNMENT bytes. It is written to a temporary file in the
+    same directory and renamed over path, so readers only ever see a complete
+    snapshot. metadata, if given, must be JSON serializable and is stored in the
+    header, where read_header(path)["metadata"] returns it.
+    """
+    store = experiment._store
+    kind, blob = _encode_labels(store.labels)
+    arrays = {
+        name: np.ascontiguousarray(values, dtype="<f8")
+        for name, values in store.params.items()
+    }
+
+    header = {
+        "version": FORMAT_VERSION,
+        "class": f"{type(experiment).__module__}:{type(experiment).__qualname__}",
+        "arms": len(store),
+        "labels": {"kind": kind, "offset": 0, "nbytes": len(blob)},
+        "params": {name: {"dtype": "<f8", "offset": 0} for name in arrays},
+        "metadata": metadata or {},
+    }
+    # offsets depend on the header size, which depends on the offsets' digits;
+    # reserving room for 20-digit offsets makes one layout pass enough
+    for section in [header["labels"], *header["params"].values()]:
+        section["offset"] = 10**19
+    start = _aligned(_PREFIX.size + len(json.dumps(header)))
+    header["labels"]["offset"] = start
+    offset = _aligned(start + len(blob))
+    for name, values in arrays.items():
+        header["params"][name]["offset"] = offset
+        offset = _aligned(offset + values.nbytes)
+    encoded = json.dumps(header).encode("utf-8")
+
+    path = os.fspath(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(handle, "wb") as out:
+            out.write(_PREFIX.pack(MAGIC, len(encoded)))
+            out.write(encoded)
+            sections = [(header["labels"]["offset"], blob)] + [
+                (header["params"][name]["offset"], values.tobytes())
+                for name, values in arrays.items()
+            ]
+            for position, data in sections:
+                out.write(b"\x00" * (position - out.tell()))
+                out.write(data)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        directory_handle = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(directory_handle)
+        finally:
+            os.close(directory_handle)
+
+
+def read_header(path) -> dict:
+    with open(path, "rb") as handle:
+        magic, length = _PREFIX.unpack(handle.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{os.fspath(path)} is not an experiment snapshot")
+        header = json.loads(handle.read(length))
+    if header["version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {header['version']}")
+    return header
+
+
+def _experiment_classes() -> dict:
+    """
+    Every experiment class defined so far, keyed like the snapshot header's
+    "class" entry, so loading never imports a module named by a file
+    """
+    # the bundled experiments, which the caller may not have imported yet
+    for module in _BUNDLED:
+        import_module(module)
+    classes = {}
+    pending = [BaseThompsonSampling]
+    while pending:
+        cls = pending.pop()
+        classes[f"{cls.__module__}:{cls.__qualname__}"] = cls
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def load(
+    path, cls: type = None, mmap_mode: str = "r", rng=None
+) -> BaseThompsonSampling:
+    """
+    Restores an experiment written by save
+
+    With mmap_mode "r" (the default) the parameter arrays are read-only memory
+    maps of the file, so any number of decision processes can share one
+    snapshot's pages without copies; "c" maps copy-on-write so local updates
+    stay private to the process, and None reads the arrays into memory. The
+    experiment is restored as the class recorded in the snapshot, which must
+    be a bundled experiment or a subclass defined (imported) before loading;
+    cls, if given, must be that class or one of its bases.
+    """
+    header = read_header(path)
+    if cls is not None and not (
+        isinstance(cls, type) and issubclass(cls, BaseThompsonSampling)
+    ):
+        raise TypeError(f"{cls!r} is not an experiment class")
+    recorded = _experiment_classes().get(header["class"])
+    if recorded is None:
+        raise ValueError(
+            f"Unknown experiment class {header['class']!r} in "
+            f"{os.fspath(path)}; import it before loading"
+        )
+    if cls is not None and not issubclass(recorded, cls):
+        raise ValueError(
+            f"{os.fspath(path)} holds a {recorded.__name__} snapshot, "
+            f"not a {cls.__name__}"
+        )
+    cls = recorded
+
+    arms = header["arms"]
+    with open(path, "rb") as handle:
+        handle.seek(header["labels"]["offset"])
+        blob = handle.read(header["labels"]["nbytes"])
+    labels = _decode_labels(header["labels"]["kind"], blob, arms)
+
+    params = {}
+    for name, section in header["params"].items():
+        if mmap_mode is None:
+            values = np.fromfile(
+                path, dtype=section["dtype"], count=arms, offset=section["offset"]
+            )
+        elif arms:
+            values = np.memmap(
+                path,
+                dtype=section["dtype"],
+                mode=mmap_mode,
+                offset=section["offset"],
+                shape=(arms,),
+            )
+        else:
+            values = np.empty(0, dtype=section["dtype"])
+        params[name] = values
+    expected = set(cls._default)
+    if expected and set(params) != expected:
+        found = sorted(params)
+        # snapshots written before a class changed how it stores its posteriors
+        try:
+            params = cls._stored_params(params)
+        except KeyError:
+            pass
+        if set(params) != expected:
+            raise ValueError(
+                f"{os.fspath(path)} holds parameters {found}, "
+                f"{cls.__name__} expects {sorted(expected)}"
+            )
+    # labels were unique when saved; the label map is built on first lookup
+    store = PosteriorStore(labels, params, build_index=False)
+    return cls._from_store(store, rng)
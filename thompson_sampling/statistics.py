@@ -0,0 +1,232 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from io import BufferedReader, BytesIO, RawIOBase
+import operator
+import os
+import numpy as np
+import pandas as pd
+from thompson_sampling.base import BaseThompsonSampling, group_rewards
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.exponential import ExponentialExperiment
+from thompson_sampling.poisson import PoissonExperiment
+from thompson_sampling.streaming import CHUNKSIZE
+
+
+class SufficientStatistics:
+    """
+    Per-arm reward counts and reward sums, the sufficient statistics of every
+    conjugate update in this package
+
+    Statistics computed on separate shards of the rewards can be merged with
+    merge or +, and the result applied to an experiment with apply_to, which
+    gives the same posteriors as adding every reward to the experiment directly.
+    """
+
+    _experiment_class = BaseThompsonSampling
+
+    def __init__(self, labels=(), counts=(), totals=()):
+        self.labels = list(labels)
+        self.counts = np.asarray(counts, dtype=np.float64)
+        self.totals = np.asarray(totals, dtype=np.float64)
+        if not len(self.labels) == len(self.counts) == len(self.totals):
+            raise ValueError("labels, counts and totals must be the same length")
+
+    @classmethod
+    def from_rewards(cls, labels, rewards=None) -> "SufficientStatistics":
+        """
+        Summarizes columns of outcomes, in the same forms add_rewards_bulk takes
+        """
+        if rewards is None:
+            labels, rewards = labels["label"], labels["reward"]
+        return cls(*group_rewards(labels, rewards))
+
+    @staticmethod
+    def for_experiment(experiment: BaseThompsonSampling) -> type:
+        """
+        The statistics class matching an experiment's likelihood
+        """
+        for stats in (BernoulliStatistics, PoissonStatistics, ExponentialStatistics):
+            if isinstance(experiment, stats._experiment_class):
+                return stats
+        raise TypeError(f"No sufficient statistics for {type(experiment).__name__}")
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __eq__(self, other) -> bool:
+        return (
+            type(self) is type(other)
+            and self.labels == other.labels
+            and np.array_equal(self.counts, other.counts)
+            and np.array_equal(self.totals, other.totals)
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(arms={len(self)}, rewards={self.counts.sum():g})"
+
+    def merge(self, other: "SufficientStatistics") -> "SufficientStatistics":
+        if type(other) is not type(self):
+            raise TypeError(
+                f"Cannot merge {type(other).__name__} into {type(self).__name__}"
+            )
+        if not len(other):
+            return self
+        if not len(self):
+            return other
+        labels, inverse = np.unique(
+            np.asarray(self.labels + other.labels), return_inverse=True
+        )
+        counts = np.bincount(
+            inverse, weights=np.concatenate([self.counts, other.counts])
+        )
+        totals = np.bincount(
+            inverse, weights=np.concatenate([self.totals, other.totals])
+        )
+        return type(self)(labels.tolist(), counts, totals)
+
+    __add__ = merge
+
+    def apply_to(self, experiment: BaseThompsonSampling) -> BaseThompsonSampling:
+        """
+        Updates the experiment's posteriors with these statistics in one step
+        """
+        if not isinstance(experiment, self._experiment_class):
+            raise TypeError(
+                f"{type(self).__name__} cannot be applied to "
+                f"{type(experiment).__name__}"
+            )
+        idx = experiment._store.positions(self.labels)
+        experiment._update_params(
+            experiment._store.params, idx, self.counts, self.totals
+        )
+        return experiment
+
+
+class BernoulliStatistics(SufficientStatistics):
+    """
+    Trials (counts) and successes (totals) per arm
+    """
+
+    _experiment_class = BernoulliExperiment
+
+
+class PoissonStatistics(SufficientStatistics):
+    """
+    Exposure periods (counts) and event counts (totals) per arm
+    """
+
+    _experiment_class = PoissonExperiment
+
+
+class ExponentialStatistics(SufficientStatistics):
+    """
+    Observations (counts) and summed durations (totals) per arm
+    """
+
+    _experiment_class = ExponentialExperiment
+
+
+class _ByteRange(RawIOBase):
+    """
+    Read-only binary stream over the bytes [start, stop) of an open file
+    """
+
+    def __init__(self, handle, start: int, stop: int):
+        handle.seek(start)
+        self._handle = handle
+        self._stop = stop
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._stop - self._handle.tell())
+        if size <= 0:
+            return 0
+        data = self._handle.read(size)
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _shard_from_csv(
+    stats: type,
+    path: str,
+    start: int,
+    stop: int,
+    label: str,
+    reward: str,
+    chunksize: int = CHUNKSIZE,
+) -> SufficientStatistics:
+    """
+    Statistics for the CSV lines that begin within the byte range [start, stop)
+
+    The range is parsed chunksize rows at a time, so a worker holds one chunk
+    rather than its whole share of the file.
+    """
+    with open(path, "rb") as handle:
+        columns = pd.read_csv(BytesIO(handle.readline()), nrows=0).columns
+        if start < handle.tell():
+            start = handle.tell()
+        else:
+            # a line straddling start belongs to the previous shard
+            handle.seek(start - 1)
+            handle.readline()
+            start = handle.tell()
+        if start >= stop:
+            return stats()
+        # and a line straddling stop to this one
+        handle.seek(stop - 1)
+        handle.readline()
+        stop = handle.tell()
+        chunks = pd.read_csv(
+            BufferedReader(_ByteRange(handle, start, stop)),
+            header=None,
+            names=columns,
+            usecols=[label, reward],
+            dtype={label: str},
+            chunksize=chunksize,
+        )
+        total = stats()
+        for frame in chunks:
+            total += stats.from_rewards(
+                frame[label].to_numpy(), frame[reward].to_numpy()
+            )
+    return total
+
+
+def ingest_parallel(
+    experiment: BaseThompsonSampling,
+    source,
+    workers: int = None,
+    label: str = "label",
+    reward: str = "reward",
+) -> BaseThompsonSampling:
+    """
+    Computes sufficient statistics on shards of source in a process pool, merges
+    them and applies the result to the experiment
+
+    source is either a DataFrame or the path of a CSV file with a header row;
+    label and reward name its columns. CSV files are split into byte ranges that
+    every worker parses on its own, so only the small per-arm statistics travel
+    between processes. A DataFrame is already parsed and in memory, where one
+    vectorized pass is cheaper than pickling its shards to other processes, so
+    it is reduced in this process and workers is ignored.
+    """
+    stats = SufficientStatistics.for_experiment(experiment)
+    if not isinstance(source, (str, os.PathLike)):
+        total = stats.from_rewards(
+            np.asarray(source[label]), np.asarray(source[reward])
+        )
+        return total.apply_to(experiment)
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(source)
+    bounds = np.linspace(0, size, workers + 1).astype(int).tolist()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _shard_from_csv, stats, os.fspath(source), start, stop, label, reward
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        total = reduce(operator.add, (future.result() for future in futures), stats())
+    return total.apply_to(experiment)
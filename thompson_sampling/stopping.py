@@ -0,0 +1,135 @@
+from typing import List, Tuple
+from scipy.special import betaln
+from thompson_sampling.analytic import probability_best
+from thompson_sampling.base import BaseThompsonSampling
+import numpy as np
+
+# Largest integer alpha for which the exact two-arm Beta sum is used
+MAX_EXACT_TERMS = 10**7
+
+
+def beta_greater(a1: float, b1: float, a2: float, b2: float) -> float:
+    """
+    P(X2 > X1) for independent X1 ~ Beta(a1, b1) and X2 ~ Beta(a2, b2)
+
+    Uses the closed-form finite sum when a2 is a whole number and falls back to
+    numerical integration otherwise.
+    """
+    if a2 == int(a2) and a2 <= MAX_EXACT_TERMS:
+        i = np.arange(int(a2))
+        terms = (
+            betaln(a1 + i, b1 + b2)
+            - np.log(b2 + i)
+            - betaln(1 + i, b2)
+            - betaln(a1, b1)
+        )
+        return float(np.clip(np.exp(terms).sum(), 0, 1))
+    params = {"a": np.array([a1, a2]), "b": np.array([b1, b2])}
+    return float(probability_best("beta", params)[1])
+
+
+def beta_two_arm(
+    a1: float, b1: float, a2: float, b2: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact probability of being best and expected loss for two Beta posteriors
+
+    The expected loss of picking arm 1 is E[max(X2 - X1, 0)], which splits into
+    size-biased Beta terms with means m1 and m2:
+    m2 * P(Beta(a2 + 1, b2) > X1) - m1 * P(X2 > Beta(a1 + 1, b1)).
+    """
+    m1, m2 = a1 / (a1 + b1), a2 / (a2 + b2)
+    p2 = beta_greater(a1, b1, a2, b2)
+    loss1 = m2 * beta_greater(a1, b1, a2 + 1, b2) - m1 * beta_greater(
+        a1 + 1, b1, a2, b2
+    )
+    loss2 = m1 * beta_greater(a2, b2, a1 + 1, b1) - m2 * beta_greater(
+        a2 + 1, b2, a1, b1
+    )
+    return np.array([1 - p2, p2]), np.clip(np.array([loss1, loss2]), 0, None)
+
+
+def monte_carlo(
+    experiment: BaseThompsonSampling,
+    budget: int = 200000,
+    batch_size: int = 10000,
+    tolerance: float = 1e-3,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Estimates every arm's probability of being best and expected loss
+
+    Posterior draws are made batch_size rows at a time until either budget draws
+    have been used or the standard error of every estimate falls below
+    tolerance. Returns (probability_best, expected_loss, draws_used), ordered
+    like experiment.posteriors.
+    """
+    arms = len(experiment.posteriors)
+    wins = np.zeros(arms)
+    loss = np.zeros(arms)
+    loss_squared = np.zeros(arms)
+    draws = 0
+    while draws < budget:
+        rows = min(batch_size, budget - draws)
+        theta = experiment._draw(rows)
+        if experiment._minimize:
+            regret = theta - theta.min(axis=1, keepdims=True)
+        else:
+            regret = theta.max(axis=1, keepdims=True) - theta
+        wins += np.bincount(experiment._best_indices(theta), minlength=arms)
+        loss += regret.sum(axis=0)
+        loss_squared += (regret**2).sum(axis=0)
+        draws += rows
+
+        prob = wins / draws
+        mean_loss = loss / draws
+        variance = np.maximum(loss_squared / draws - mean_loss**2, 0)
+        error = max(
+            np.sqrt(prob * (1 - prob) / draws).max(),
+            np.sqrt(variance / draws).max(),
+        )
+        if error < tolerance:
+            break
+    return wins / draws, loss / draws, draws
+
+
+def evaluate(
+    experiment: BaseThompsonSampling,
+    budget: int = 200000,
+    batch_size: int = 10000,
+    tolerance: float = 1e-3,
+    exact: bool = True,
+) -> List[dict]:
+    """
+    Probability of being best and expected loss for every arm of an experiment
+
+    The expected loss of an arm is how much worse, on average, it is than the
+    best arm - the regret of stopping now and keeping it. Two-arm Beta
+    experiments use the exact path when exact is True; everything else uses
+    batched Monte Carlo (see monte_carlo for the budget and tolerance).
+    """
+    params = experiment._store.params
+    if exact and experiment._posterior == "beta" and len(experiment.posteriors) == 2:
+        prob, loss = beta_two_arm(
+            params["a"][0], params["b"][0], params["a"][1], params["b"][1]
+        )
+    else:
+        prob, loss, _ = monte_carlo(experiment, budget, batch_size, tolerance)
+    prob, loss = prob.tolist(), loss.tolist()
+    return [
+        {"Label": k, "Probability Best": prob[i], "Expected Loss": loss[i]}
+        for i, k in enumerate(experiment.posteriors)
+    ]
+
+
+def should_stop(
+    experiment: BaseThompsonSampling, threshold: float, **kwargs
+) -> Tuple[bool, str]:
+    """
+    Expected-loss stopping rule
+
+    Returns whether the arm with the lowest expected loss can be kept with an
+    expected loss below threshold, together with that arm's label. Extra
+    keyword arguments are passed to evaluate.
+    """
+    stats = min(evaluate(experiment, **kwargs), key=lambda s: s["Expected Loss"])
+    return bool(stats["Expected Loss"] < threshold), stats["Label"]
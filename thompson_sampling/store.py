@@ -0,0 +1,228 @@
+from collections.abc import Mapping
+from typing import Dict, Iterable
+import numpy as np
+
+
+class PosteriorView(Mapping):
+    """
+    Read-only, dict-like view over a PosteriorStore
+
+    posteriors["option1"] returns a fresh {param: value} dict for that arm, so
+    code written against the old dict of dicts keeps working. transform, if
+    given, maps each stored row to the form it is presented in.
+    """
+
+    def __init__(self, store: "PosteriorStore", transform=None):
+        self._store = store
+        self._transform = transform
+
+    def __getitem__(self, label) -> dict:
+        row = self._store.row(label)
+        return row if self._transform is None else self._transform(row)
+
+    def __iter__(self):
+        return iter(self._store.labels)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class PosteriorStore:
+    """
+    Posterior parameters for every arm held in contiguous float64 arrays
+
+    There is one array per distribution parameter (e.g. "a" and "b" for a Beta
+    posterior) and a label -> index map, so arm i's parameters live at
+    params[name][i] for every name. float64 arrays passed in are used as-is
+    rather than copied, which lets the store sit on top of a memory map.
+
+    Arms can be appended and removed in amortized O(1): the arrays are views
+    onto buffers with spare capacity at the end, which doubles when full, and
+    a removed arm is overwritten by the last one so live arms stay contiguous.
+    Removal therefore changes the index of the arm that was moved.
+    """
+
+    def __init__(
+        self, labels: Iterable, params: Dict[str, Iterable], build_index: bool = True
+    ):
+        self.labels = list(labels)
+        self._index = None
+        self._buffers = None
+        if build_index:
+            self.index
+        self.params = {
+            name: np.asarray(values, dtype=np.float64)
+            for name, values in params.items()
+        }
+        for name, values in self.params.items():
+            if values.shape != (len(self.labels),):
+                raise ValueError(
+                    f"Parameter {name} has shape {values.shape}, "
+                    f"expected ({len(self.labels)},)"
+                )
+
+    @property
+    def index(self) -> dict:
+        """
+        label -> arm index map, built on first use when the store was created
+        with build_index=False (e.g. by a snapshot load that only serves decisions)
+        """
+        if self._index is None:
+            index = dict(zip(self.labels, range(len(self.labels))))
+            if len(index) != len(self.labels):
+                raise ValueError("Arm labels must be unique")
+            self._index = index
+        return self._index
+
+    @classmethod
+    def from_dicts(cls, posteriors: Dict[str, dict]) -> "PosteriorStore":
+        """
+        Builds a store from the {label: {param: value}} layout used by priors
+        """
+        labels = list(posteriors)
+        names = list(posteriors[labels[0]]) if labels else []
+        params = {name: [posteriors[label][name] for label in labels] for name in names}
+        return cls(labels, params)
+
+    @classmethod
+    def from_default(cls, labels: Iterable, default: dict) -> "PosteriorStore":
+        """
+        Builds a store where every arm starts from the same parameters
+        """
+        labels = list(labels)
+        params = {name: np.full(len(labels), value) for name, value in default.items()}
+        return cls(labels, params)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __contains__(self, label) -> bool:
+        return label in self.index
+
+    def positions(self, labels) -> np.ndarray:
+        """
+        Maps an iterable of labels to their arm indices, one dict lookup each
+        """
+        labels = list(labels)
+        return np.fromiter(
+            (self.index[label] for label in labels), dtype=np.intp, count=len(labels)
+        )
+
+    def lookup(self, labels) -> np.ndarray:
+        """
+        Maps an array of labels to their arm indices
+
+        Each distinct label is looked up once, so the Python-level work is
+        proportional to the number of arms touched rather than the number of rows.
+        """
+        labels = np.asarray(labels)
+        if labels.size == 0:
+            return np.empty(0, dtype=np.intp)
+        uniques, inverse = np.unique(labels, return_inverse=True)
+        return self.positions(uniques.tolist())[inverse.reshape(-1)]
+
+    def _reserve(self, size: int) -> None:
+        """
+        Resizes the parameter arrays to size arms, doubling the underlying
+        buffers when they run out of capacity
+        """
+        n = len(self.labels)
+        capacity = len(next(iter(self._buffers.values()))) if self._buffers else n
+        if size > capacity:
+            capacity = max(2 * capacity, size, 8)
+            buffers = {}
+            for name, current in self.params.items():
+                buffers[name] = np.empty(capacity)
+                buffers[name][:n] = current
+            self._buffers = buffers
+        elif self._buffers is None:
+            self._buffers = dict(self.params)
+        for name, buffer in self._buffers.items():
+            self.params[name] = buffer[:size]
+
+    def append(self, label, values: dict) -> int:
+        """
+        Adds an arm with the given {param: value} parameters, returning its index
+        """
+        if set(values) != set(self.params):
+            raise ValueError(f"Expected values for {sorted(self.params)}")
+        if label in self.index:
+            raise ValueError(f"Arm {label!r} already exists")
+        n = len(self.labels)
+        self._reserve(n + 1)
+        for name, array in self.params.items():
+            array[n] = values[name]
+        self.labels.append(label)
+        self.index[label] = n
+        return n
+
+    def update(self, labels, params: Dict[str, Iterable]) -> None:
+        """
+        Sets the parameters of many arms at once, like dict.update: labels
+        already in the store are overwritten in place, new ones are appended in
+        order of first appearance and the last row wins for repeated labels
+        """
+        labels = list(labels)
+        if set(params) != set(self.params):
+            raise ValueError(f"Expected values for {sorted(self.params)}")
+        index = self.index
+        n = len(self.labels)
+        positions = np.fromiter(
+            (index.setdefault(label, len(index)) for label in labels),
+            dtype=np.intp,
+            count=len(labels),
+        )
+        added = len(index) - n
+        if added:
+            new = [None] * added
+            for label, i in zip(labels, positions.tolist()):
+                if i >= n:
+                    new[i - n] = label
+            self._reserve(n + added)
+            self.labels.extend(new)
+        # keep only the last row for each arm, so fancy assignment is unambiguous
+        _, first_reversed = np.unique(positions[::-1], return_index=True)
+        rows = len(positions) - 1 - first_reversed
+        for name, values in self.params.items():
+            values[positions[rows]] = np.asarray(params[name], dtype=np.float64)[rows]
+
+    def remove(self, label) -> None:
+        """
+        Removes an arm, moving the last arm into its slot
+        """
+        i = self.index.pop(label)
+        last = len(self.labels) - 1
+        if i != last:
+            moved = self.labels[last]
+            self.labels[i] = moved
+            self.index[moved] = i
+            for values in self.params.values():
+                values[i] = values[last]
+        # the freed tail of the arrays becomes spare capacity
+        self._reserve(last)
+        self.labels.pop()
+
+    def row(self, label) -> dict:
+        i = self.index[label]
+        return {name: float(values[i]) for name, values in self.params.items()}
+
+    def copy(self, readonly: bool = False) -> "PosteriorStore":
+        """
+        Independent copy of the store; with readonly the parameter arrays of the
+        copy reject writes, which makes it safe to share as a snapshot
+        """
+        store = object.__new__(PosteriorStore)
+        store.labels = self.labels[:]
+        store._index = None if self._index is None else self._index.copy()
+        store._buffers = None
+        store.params = {name: values.copy() for name, values in self.params.items()}
+        if readonly:
+            for values in store.params.values():
+                values.flags.writeable = False
+        return store
+
+    def view(self, transform=None) -> PosteriorView:
+        return PosteriorView(self, transform)
@@ -0,0 +1,149 @@
+from itertools import islice
+import csv
+import json
+import os
+import numpy as np
+from thompson_sampling.base import BaseThompsonSampling
+from thompson_sampling import snapshot
+
+# Rows parsed and applied per vectorized update
+CHUNKSIZE = 100000
+# a .json file usually holds a single array, which cannot be read line by line
+_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def _as_text(line) -> str:
+    return line.decode("utf-8") if isinstance(line, bytes) else line
+
+
+def _parse(lines: list, format: str, columns, label: str, reward: str):
+    """
+    Turns a chunk of raw CSV or JSON-lines records into label and reward arrays
+    """
+    if format == "csv":
+        rows = [row for row in csv.reader(_as_text(line) for line in lines) if row]
+        position, value = columns
+        labels = [row[position] for row in rows]
+        rewards = [row[value] for row in rows]
+    else:
+        records = [json.loads(line) for line in lines if line.strip()]
+        labels = [record[label] for record in records]
+        rewards = [record[reward] for record in records]
+    return np.asarray(labels), np.asarray(rewards, dtype=np.float64)
+
+
+def _csv_columns(header, label: str, reward: str):
+    names = next(csv.reader([_as_text(header)]))
+    try:
+        return names.index(label), names.index(reward)
+    except ValueError:
+        raise ValueError(f"CSV header {names} needs {label!r} and {reward!r} columns")
+
+
+def iter_reward_chunks(
+    source,
+    chunksize: int = CHUNKSIZE,
+    format: str = None,
+    offset: int = 0,
+    label: str = "label",
+    reward: str = "reward",
+):
+    """
+    Reads outcomes from source chunksize records at a time
+
+    source can be the path of a CSV (with a header row) or JSON-lines file, an
+    open file object in either format, or any iterable of {"label", "reward"}
+    dicts or (label, reward) pairs. format ("csv" or "jsonl") is inferred from
+    a path's extension (.csv, .jsonl or .ndjson) and defaults to "jsonl" for
+    file objects; JSON files holding one array are not supported.
+
+    Yields (labels, rewards, offset) where offset is the position just after the
+    chunk: a byte offset for paths and a record count for everything else.
+    Passing it back as offset resumes reading from that point.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        format = format or _FORMATS.get(os.path.splitext(source)[1].lower())
+        if format is None:
+            raise ValueError(f"Cannot infer the format of {source}, pass format=")
+        with open(source, "rb") as handle:
+            columns = None
+            if format == "csv":
+                columns = _csv_columns(handle.readline(), label, reward)
+            if offset:
+                handle.seek(offset)
+            while True:
+                lines = list(islice(iter(handle.readline, b""), chunksize))
+                if not lines:
+                    return
+                labels, rewards = _parse(lines, format, columns, label, reward)
+                yield labels, rewards, handle.tell()
+    elif hasattr(source, "readline"):
+        format = format or "jsonl"
+        records = iter(source.readline, source.read(0))
+        columns = None
+        if format == "csv":
+            columns = _csv_columns(next(records), label, reward)
+        records = islice(records, offset, None)
+        while True:
+            lines = list(islice(records, chunksize))
+            if not lines:
+                return
+            offset += len(lines)
+            yield (*_parse(lines, format, columns, label, reward), offset)
+    else:
+        records = islice(iter(source), offset, None)
+        while True:
+            rows = list(islice(records, chunksize))
+            if not rows:
+                return
+            offset += len(rows)
+            if isinstance(rows[0], dict):
+                labels = [row[label] for row in rows]
+                rewards = [row[reward] for row in rows]
+            else:
+                labels, rewards = zip(*rows)
+            yield np.asarray(labels), np.asarray(rewards, dtype=np.float64), offset
+
+
+def ingest_stream(
+    experiment: BaseThompsonSampling,
+    source,
+    chunksize: int = CHUNKSIZE,
+    format: str = None,
+    checkpoint=None,
+    offset: int = 0,
+    label: str = "label",
+    reward: str = "reward",
+) -> BaseThompsonSampling:
+    """
+    Applies every outcome in source to the experiment, one chunk at a time
+
+    Only one chunk is held in memory, so arbitrarily large inputs are handled
+    in constant space. With checkpoint, the experiment is snapshotted to that
+    path after every chunk together with the offset reached; because state and
+    offset are written in one atomic rename they can never disagree, and
+    resume_stream(checkpoint, source) carries on exactly where a failed run
+    stopped. A checkpoint is also written before the first chunk, so one
+    exists even for an empty source.
+    """
+    if checkpoint is not None:
+        snapshot.save(experiment, checkpoint, {"stream": {"offset": offset}})
+    for labels, rewards, offset in iter_reward_chunks(
+        source, chunksize, format, offset, label, reward
+    ):
+        experiment.add_rewards_bulk(labels, rewards)
+        if checkpoint is not None:
+            snapshot.save(experiment, checkpoint, {"stream": {"offset": offset}})
+    return experiment
+
+
+def resume_stream(checkpoint, source, **kwargs) -> BaseThompsonSampling:
+    """
+    Restores the experiment saved by ingest_stream at checkpoint and ingests
+    the rest of source, which must be the same input as the interrupted run
+    """
+    offset = snapshot.read_header(checkpoint)["metadata"]["stream"]["offset"]
+    experiment = snapshot.load(checkpoint, mmap_mode=None)
+    return ingest_stream(
+        experiment, source, checkpoint=checkpoint, offset=offset, **kwargs
+    )
@@ -0,0 +1,76 @@
+import pytest
+import asyncio
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.aio import AsyncExperiment
+
+
+class TestAsyncExperiment:
+    def test_choose_coalesces_calls(self):
+        exper = BernoulliExperiment(arms=3, rng=0)
+        metrics = exper.instrument()
+        draws = []
+        choose_indices = exper._choose_indices
+        exper._choose_indices = lambda n, *args: draws.append(n) or choose_indices(n)
+
+        async def main():
+            async with AsyncExperiment(exper, window=0.01, max_batch=40) as service:
+                return await asyncio.gather(*(service.choose() for _ in range(100)))
+
+        labels = asyncio.run(main())
+        assert len(labels) == 100
+        assert set(labels) <= {"option1", "option2", "option3"}
+        assert draws == [40, 40, 20]
+        assert metrics.decisions == 100
+        assert metrics.latency["choose_arms"].count == 3
+
+    def test_report_batches_updates(self):
+        exper = BernoulliExperiment(arms=2)
+
+        async def main():
+            service = AsyncExperiment(exper, flush_size=3, flush_interval=0.01)
+            await service.report("option1", 1)
+            await service.report("option1", 0)
+            assert service.pending == 2
+            assert exper.posteriors["option1"] == {"a": 1, "b": 1}
+            await service.report("option2", 1)
+            assert service.pending == 0
+            assert exper.posteriors["option1"] == {"a": 2, "b": 2}
+            await service.report("option2", 1)
+            await asyncio.sleep(0.05)
+            assert service.pending == 0
+            assert exper.posteriors["option2"] == {"a": 3, "b": 1}
+            with pytest.raises(KeyError):
+                await service.report("option3", 1)
+
+        asyncio.run(main())
+
+    def test_flush_after_remove_arm(self):
+        exper = BernoulliExperiment(arms=2)
+
+        async def main():
+            service = AsyncExperiment(exper, flush_size=10, flush_interval=0.01)
+            await service.report("option1", 1)
+            await service.report("option2", 1)
+            exper.remove_arm("option2")
+            await asyncio.sleep(0.05)
+            assert service.pending == 0
+            assert exper.posteriors == {"option1": {"a": 2, "b": 1}}
+
+        asyncio.run(main())
+
+    def test_backpressure(self):
+        async def main():
+            service = AsyncExperiment(
+                BernoulliExperiment(arms=2), window=0.05, max_waiting=5
+            )
+            tasks = [asyncio.ensure_future(service.choose()) for _ in range(8)]
+            await asyncio.sleep(0.01)
+            assert service.waiting == 5
+            labels = await asyncio.gather(*tasks)
+            assert len(labels) == 8 and service.waiting == 0
+
+        asyncio.run(main())
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            AsyncExperiment(BernoulliExperiment(arms=2), max_batch=0)
@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+from thompson_sampling.analytic import (
+    MAX_QUADRATURE_ARMS,
+    TOLERANCE,
+    probability_best,
+)
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.exponential import ExponentialExperiment
+
+
+class TestProbabilityBest:
+    def test_identical_arms(self):
+        params = {"a": np.array([5.0, 5.0, 5.0]), "b": np.array([7.0, 7.0, 7.0])}
+        np.testing.assert_allclose(probability_best("beta", params), [1 / 3] * 3)
+
+    def test_matches_simulation(self):
+        params = {"a": np.array([10.0, 12.0, 30.0]), "b": np.array([90.0, 88, 270])}
+        draws = np.random.default_rng(0).beta(
+            params["a"], params["b"], size=(200000, 3)
+        )
+        simulated = np.bincount(draws.argmax(axis=1), minlength=3) / 200000
+        np.testing.assert_allclose(
+            probability_best("beta", params), simulated, atol=0.005
+        )
+
+    def test_minimize(self):
+        params = {"shape": np.array([50.0, 50.0]), "scale": np.array([0.02, 0.04])}
+        best = probability_best("gamma", params, minimize=True)
+        assert best[0] > 0.99
+        # no longer renormalized, so the sum carries the integration error
+        assert best.sum() == pytest.approx(1, abs=TOLERANCE)
+
+    def test_integration_error(self):
+        params = {
+            "shape": np.array([0.001, 0.001, 5]),
+            "scale": np.array([1000, 1000, 0.1]),
+        }
+        with pytest.raises(ValueError):
+            probability_best("gamma", params, minimize=True)
+
+    def test_experiments_fall_back_to_sampling(self):
+        exper = ExponentialExperiment(3, rng=0)
+        exper.add_rewards_bulk(["option3"] * 5, [10] * 5)
+        best = exper._probability_best()
+        assert best.sum() == pytest.approx(1)
+        assert best[2] < 0.1
+        many = BernoulliExperiment(MAX_QUADRATURE_ARMS + 1, rng=0)
+        assert many._probability_best(draws=100).sum() == pytest.approx(1)
+
+    def test_unknown_posterior(self):
+        with pytest.raises(ValueError):
+            probability_best("normal", {"mu": np.zeros(2)})
@@ -1,14 +1,16 @@
 import pytest
+from collections.abc import Mapping
 from thompson_sampling.bernoulli import BernoulliExperiment
 from thompson_sampling.priors import BetaPrior
-from pandas import Series
+from pandas import Series, DataFrame
+import numpy as np
 
 
 class TestBernoulliExperiment:
     def test_init_arms(self):
         exper = BernoulliExperiment(3)
         assert len(exper.posteriors) == 3
-        assert isinstance(exper.posteriors, dict)
+        assert isinstance(exper.posteriors, Mapping)
         for k, _ in exper.posteriors.items():
             assert isinstance(exper.posteriors[k], dict)
             assert exper.posteriors[k] == {"a": 1, "b": 1}
@@ -34,11 +36,138 @@ class TestBernoulliExperiment:
             "option3": {"a": 1, "b": 1},
         }
 
+    def test_add_rewards_bulk(self):
+        labels = np.random.choice(["option1", "option2", "option3"], size=500)
+        rewards = np.random.binomial(1, 0.3, size=500)
+        one_by_one = BernoulliExperiment(3)
+        for label, reward in zip(labels, rewards):
+            one_by_one.add_rewards([{"label": label, "reward": reward}])
+        bulk = BernoulliExperiment(3).add_rewards_bulk(labels, rewards)
+        frame = BernoulliExperiment(3).add_rewards_bulk(
+            DataFrame({"label": labels, "reward": rewards})
+        )
+        assert bulk.posteriors == one_by_one.posteriors
+        assert frame.posteriors == one_by_one.posteriors
+
+    def test_add_rewards_bulk_errors(self):
+        exper = BernoulliExperiment(3)
+        with pytest.raises(ValueError):
+            exper.add_rewards_bulk(["option1", "option2"], [1])
+        with pytest.raises(KeyError):
+            exper.add_rewards_bulk(["option4"], [1])
+
     def test_pull_arm(self):
         exper = BernoulliExperiment(3)
         assert exper.choose_arm() in [key for key, _ in exper.posteriors.items()]
 
+    def test_pull_arm_picks_max(self):
+        exper = BernoulliExperiment(arms=3)
+        exper._store.params["a"][:] = [1, 1000, 1]
+        exper._store.params["b"][:] = [1000, 1, 1000]
+        assert exper.choose_arm() == "option2"
+
+    def test_pull_arm_random_ties(self):
+        exper = BernoulliExperiment(arms=2)
+        exper._draw = lambda: exper._store.params["a"].copy()
+        assert {exper.choose_arm() for _ in range(100)} == {"option1", "option2"}
+
+    def test_scalar_draw_matches_vectorized(self):
+        # few arms are drawn with scalar sampler calls, from the same stream
+        exper = BernoulliExperiment(arms=3, rng=0)
+        exper._store.params["a"][:] = [2, 30, 5]
+        theta = exper._draw()
+        expected = np.random.default_rng(0).beta(a=[2, 30, 5], b=[1, 1, 1])
+        assert theta.tolist() == expected.tolist()
+
     def test_get_ppd(self):
         exper = BernoulliExperiment(3)
         assert isinstance(exper.get_ppd(size=10000), list)
         assert len(exper.get_ppd(size=1000)) == len(exper.posteriors)
+
+    def test_choose_arms(self):
+        exper = BernoulliExperiment(arms=3)
+        exper._store.params["a"][:] = [1, 1000, 1]
+        exper._store.params["b"][:] = [1000, 1, 1000]
+        decisions, counts = exper.choose_arms(50, return_counts=True)
+        assert decisions == ["option2"] * 50
+        assert counts.tolist() == [0, 50, 0]
+
+    def test_choose_arms_chunked(self):
+        exper = BernoulliExperiment(arms=4)
+        choices = exper.choose_arms(101, as_labels=False, max_samples=10)
+        assert choices.shape == (101,)
+        assert set(choices.tolist()) <= {0, 1, 2, 3}
+
+    def test_choose_top_k(self):
+        exper = BernoulliExperiment(arms=4)
+        exper._store.params["a"][:] = [1, 1000, 500, 1]
+        exper._store.params["b"][:] = [1000, 1, 500, 1000]
+        assert exper.choose_top_k(2) == ["option2", "option3"]
+        assert exper.choose_top_k(1, as_labels=False).tolist() == [1]
+        assert sorted(exper.choose_top_k(4)) == list(exper.posteriors)
+        with pytest.raises(ValueError):
+            exper.choose_top_k(5)
+
+    def test_choose_top_two(self):
+        exper = BernoulliExperiment(arms=3, rng=0)
+        exper._store.params["a"][:] = [1, 1000, 990]
+        exper._store.params["b"][:] = [1000, 1, 10]
+        assert exper.choose_top_two(beta=1) == "option2"
+        assert exper.choose_top_two(beta=0) == "option3"
+        # the challenger almost never wins a draw, so the runner-up is used
+        assert exper.choose_top_two(beta=0, max_resamples=1, as_label=False) == 2
+        with pytest.raises(ValueError):
+            exper.choose_top_two(beta=2)
+
+    def test_add_and_remove_arms(self):
+        exper = BernoulliExperiment(arms=2)
+        exper.add_rewards([{"label": "option1", "reward": 1}])
+        exper.add_arm("new").add_arm("warm", {"a": 10, "b": 5})
+        assert exper.posteriors == {
+            "option1": {"a": 2, "b": 1},
+            "option2": {"a": 1, "b": 1},
+            "new": {"a": 1, "b": 1},
+            "warm": {"a": 10, "b": 5},
+        }
+        exper.remove_arm("option1")
+        exper.add_rewards([{"label": "warm", "reward": 0}])
+        assert exper.posteriors["warm"] == {"a": 10, "b": 6}
+        assert set(exper.choose_arms(100)) <= {"option2", "new", "warm"}
+        with pytest.raises(ValueError):
+            exper.add_arm("new")
+        with pytest.raises(ValueError):
+            BernoulliExperiment(arms=1).remove_arm("option1")
+
+    def test_retire_dominated_arms(self):
+        exper = BernoulliExperiment(arms=4)
+        exper._store.params["a"][:] = [1, 100, 95, 1]
+        exper._store.params["b"][:] = [100, 100, 100, 100]
+        assert exper.retire_dominated_arms(0.01) == ["option1", "option4"]
+        assert list(exper.posteriors) == ["option3", "option2"]
+        assert exper.retire_dominated_arms(0.9) == ["option3"]
+        assert exper.retire_dominated_arms(1.0) == []
+
+    def test_retire_dominated_arms_exact(self):
+        exper = BernoulliExperiment(arms=1000, rng=0)
+        exper._store.params["a"][:] = np.r_[[200, 190], np.ones(998)]
+        exper._store.params["b"][:] = 200
+        retired = exper.retire_dominated_arms(0.01, draws=1000)
+        assert len(retired) == 998 and list(exper.posteriors) == ["option1", "option2"]
+        assert exper.retire_dominated_arms(0.5, exact=True) == ["option2"]
+
+    def test_get_ppd_samples(self):
+        exper = BernoulliExperiment(3)
+        ppd, samples = exper.get_ppd(size=500, return_samples=True)
+        assert len(ppd) == 3
+        assert samples.shape == (3, 500)
+        assert ppd[0]["Percentage - Success"] == samples[0].mean()
+
+    def test_get_ppd_analytic(self):
+        exper = BernoulliExperiment(3)
+        ppd = exper.get_ppd(analytic=True)
+        assert len(ppd) == 3
+        assert sum(stats["Probability Best"] for stats in ppd) == pytest.approx(1)
+        with pytest.raises(ValueError):
+            exper.get_ppd()
+        exper.add_rewards([{"label": "option1", "reward": 1}])
+        assert exper.get_ppd(analytic=True)[0]["Percentage - Success"] == 2 / 3
@@ -0,0 +1,115 @@
+import pytest
+import threading
+import time
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.concurrency import ConcurrentExperiment
+
+
+class TestConcurrentExperiment:
+    def test_buffered_until_flush(self):
+        shared = ConcurrentExperiment(BernoulliExperiment(arms=2), flush_size=10)
+        shared.add_rewards([{"label": "option1", "reward": 1}])
+        assert shared.pending == 1
+        assert shared.posteriors["option1"] == {"a": 1, "b": 1}
+        shared.flush()
+        assert shared.pending == 0
+        assert shared.posteriors["option1"] == {"a": 2, "b": 1}
+
+    def test_flush_size(self):
+        shared = ConcurrentExperiment(BernoulliExperiment(arms=2), flush_size=3)
+        shared.add_rewards_bulk(["option1", "option2", "option2"], [1, 0, 1])
+        assert shared.pending == 0
+        assert shared.experiment.posteriors["option2"] == {"a": 2, "b": 2}
+
+    def test_flush_interval(self):
+        with ConcurrentExperiment(
+            BernoulliExperiment(arms=2), flush_size=100, flush_interval=0.01
+        ) as shared:
+            shared.add_rewards_bulk(["option1"], [1])
+            deadline = time.monotonic() + 5
+            while shared.pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert shared.posteriors["option1"] == {"a": 2, "b": 1}
+
+    def test_unknown_label(self):
+        shared = ConcurrentExperiment(BernoulliExperiment(arms=2))
+        with pytest.raises(KeyError):
+            shared.add_rewards_bulk(["option3"], [1])
+        assert shared.pending == 0
+
+    def test_concurrent_readers_and_writers(self):
+        shared = ConcurrentExperiment(
+            BernoulliExperiment(arms=5), flush_size=50, seed=0
+        )
+        errors = []
+
+        def read():
+            try:
+                for _ in range(200):
+                    assert shared.choose_arm() in shared.posteriors
+                    assert len(shared.choose_arms(10)) == 10
+            except Exception as error:
+                errors.append(error)
+
+        def write():
+            for _ in range(200):
+                shared.add_rewards([{"label": "option3", "reward": 1}])
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        threads += [threading.Thread(target=write) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        shared.close()
+        assert not errors
+        assert shared.posteriors["option3"] == {"a": 801, "b": 1}
+
+    def test_snapshot_is_read_only(self):
+        shared = ConcurrentExperiment(BernoulliExperiment(arms=2))
+        with pytest.raises(ValueError):
+            shared._snapshot.store.params["a"][0] = 5
+
+    def test_metrics(self):
+        experiment = BernoulliExperiment(arms=2)
+        experiment._store.params["a"][:] = [1000, 1]
+        experiment._store.params["b"][:] = [1, 1000]
+        metrics = experiment.instrument()
+        shared = ConcurrentExperiment(experiment)
+        # the live store moves option2 into slot 0, the snapshot still decides
+        experiment.remove_arm("option1")
+        assert shared.choose_arm() == "option1"
+        assert shared.choose_arms(5) == ["option1"] * 5
+        assert metrics.latency["choose_arm"].count == 1
+        assert metrics.latency["choose_arms"].count == 1
+        assert metrics.selections == {"option1": 6}
+
+    def test_flush_after_remove_arm(self):
+        shared = ConcurrentExperiment(BernoulliExperiment(arms=3), flush_size=10)
+        shared.add_rewards_bulk(["option1", "option2", "option3"], [1, 0, 1])
+        shared.experiment.remove_arm("option3")
+        shared.flush()
+        assert shared.pending == 0
+        assert shared.posteriors["option1"] == {"a": 2, "b": 1}
+        assert shared.posteriors["option2"] == {"a": 1, "b": 2}
+
+    def test_flush_interval_survives_failure(self):
+        experiment = BernoulliExperiment(arms=2)
+        update = experiment.add_rewards_bulk
+        calls = []
+
+        def flaky(*args):
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise RuntimeError("transient")
+            return update(*args)
+
+        experiment.add_rewards_bulk = flaky
+        with ConcurrentExperiment(
+            experiment, flush_size=100, flush_interval=0.01
+        ) as shared:
+            shared.add_rewards_bulk(["option1"], [1])
+            deadline = time.monotonic() + 5
+            while shared.pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert shared.posteriors["option1"] == {"a": 2, "b": 1}
@@ -1,14 +1,16 @@
 import pytest
+from collections.abc import Mapping
 from thompson_sampling.exponential import ExponentialExperiment
 from thompson_sampling.priors import GammaPrior
 from pandas import Series
+import numpy as np
 
 
 class TestExponentialExperiment:
     def test_init_arms(self):
         exper = ExponentialExperiment(3)
         assert len(exper.posteriors) == 3
-        assert isinstance(exper.posteriors, dict)
+        assert isinstance(exper.posteriors, Mapping)
         for k, _ in exper.posteriors.items():
             assert isinstance(exper.posteriors[k], dict)
             assert exper.posteriors[k] == {"shape": 0.001, "scale": 1000}
@@ -28,17 +30,66 @@ class TestExponentialExperiment:
         exper.add_rewards(
             [{"label": "option1", "reward": 1}, {"label": "option2", "reward": 0}]
         )
-        assert exper.posteriors == {
-            "option1": {"shape": 1.001, "scale": 0.999},
-            "option2": {"shape": 1.001, "scale": 1000.0},
-            "option3": {"shape": 0.001, "scale": 1000},
-        }
+        assert exper.posteriors["option1"] == pytest.approx(
+            {"shape": 1.001, "scale": 1 / 1.001}
+        )
+        assert exper.posteriors["option2"] == {"shape": 1.001, "scale": 1000.0}
+        assert exper.posteriors["option3"] == {"shape": 0.001, "scale": 1000}
+
+    def test_add_rewards_bulk(self):
+        labels = np.random.choice(["option1", "option2"], size=200)
+        rewards = np.random.exponential(2.0, size=200)
+        exper = ExponentialExperiment(3).add_rewards_bulk(labels, rewards)
+        shape = 0.001 + (labels == "option1").sum()
+        scale = 1 / (1 / 1000 + rewards[labels == "option1"].sum())
+        assert exper.posteriors["option1"] == pytest.approx(
+            {"shape": shape, "scale": scale}
+        )
+        assert exper.posteriors["option3"] == {"shape": 0.001, "scale": 1000}
+
+    def test_add_arm_takes_scale(self):
+        exper = ExponentialExperiment(2).add_arm("warm", {"shape": 2, "scale": 0.5})
+        assert exper.posteriors["warm"] == {"shape": 2, "scale": 0.5}
+        np.testing.assert_array_equal(exper._store.params["rate"], [0.001, 0.001, 2])
 
     def test_pull_arm(self):
         exper = ExponentialExperiment(3)
         assert exper.choose_arm() in [key for key, _ in exper.posteriors.items()]
 
+    def test_pull_arm_picks_min(self):
+        exper = ExponentialExperiment(arms=3)
+        exper._store.params["shape"][:] = [1000, 1000, 1000]
+        exper._store.params["rate"][:] = [100, 10000, 100]
+        assert exper.choose_arm() == "option2"
+
     def test_get_ppd(self):
         exper = ExponentialExperiment(3)
         assert isinstance(exper.get_ppd(size=10000), list)
         assert len(exper.get_ppd(size=1000)) == len(exper.posteriors)
+
+    def test_choose_arms(self):
+        exper = ExponentialExperiment(arms=3)
+        exper._store.params["shape"][:] = [1000, 1000, 1000]
+        exper._store.params["rate"][:] = [100, 10000, 100]
+        assert exper.choose_arms(20) == ["option2"] * 20
+
+    def test_choose_top_k_picks_min(self):
+        exper = ExponentialExperiment(arms=3)
+        exper._store.params["shape"][:] = [1000, 1000, 1000]
+        exper._store.params["rate"][:] = [100, 10000, 1000]
+        assert exper.choose_top_k(2) == ["option2", "option3"]
+        assert exper.choose_top_two(beta=0) == "option3"
+
+    def test_get_ppd_samples(self):
+        exper = ExponentialExperiment(3)
+        ppd, samples = exper.get_ppd(size=500, return_samples=True)
+        assert len(ppd) == 3
+        assert samples.shape == (3, 500)
+
+    def test_get_ppd_analytic(self):
+        exper = ExponentialExperiment(3)
+        ppd = exper.get_ppd(analytic=True)
+        assert len(ppd) == 3
+        assert sum(stats["Probability Best"] for stats in ppd) == pytest.approx(1)
+        with pytest.raises(ValueError):
+            exper.get_ppd()
@@ -0,0 +1,48 @@
+import pytest
+import json
+import subprocess
+import sys
+
+CORE_MODULES = [
+    "thompson_sampling.bernoulli",
+    "thompson_sampling.poisson",
+    "thompson_sampling.exponential",
+    "thompson_sampling.priors",
+]
+HEAVY_MODULES = ["pandas", "scipy", "seaborn", "matplotlib"]
+
+# Importing the core modules on top of NumPy used to take the best part of a
+# second because of pandas and the plotting stack; this leaves ample headroom
+# for slow CI machines while still catching any of them creeping back in.
+IMPORT_BUDGET_SECONDS = 0.25
+
+SCRIPT = f"""
+import json, sys, time
+import numpy
+start = time.perf_counter()
+for name in {CORE_MODULES!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+from thompson_sampling.bernoulli import BernoulliExperiment
+exper = BernoulliExperiment(arms=3)
+exper.add_rewards_bulk(["option1"], [1])
+exper.choose_arm()
+loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def run_fresh_interpreter() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, check=True, text=True
+    )
+    return json.loads(output.stdout)
+
+
+class TestImports:
+    def test_core_path_only_needs_numpy(self):
+        assert run_fresh_interpreter()["loaded"] == []
+
+    def test_import_time(self):
+        elapsed = min(run_fresh_interpreter()["elapsed"] for _ in range(3))
+        assert elapsed < IMPORT_BUDGET_SECONDS
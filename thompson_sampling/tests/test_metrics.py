@@ -0,0 +1,75 @@
+import numpy as np
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.concurrency import ConcurrentExperiment
+from thompson_sampling.metrics import Histogram, Metrics
+
+
+class TestMetrics:
+    def test_not_installed_by_default(self):
+        exper = BernoulliExperiment(2)
+        exper.choose_arm()
+        assert exper._metrics is None
+
+    def test_counters_and_totals(self):
+        exper = BernoulliExperiment(3, rng=0)
+        metrics = exper.instrument()
+        exper.choose_arm()
+        decisions, counts = exper.choose_arms(10, return_counts=True)
+        exper.choose_top_k(2)
+        exper.add_rewards_bulk(["option1", "option2", "option1"], [1, 0, 1])
+        stats = metrics.as_dict()
+        assert stats["decisions"] == 12
+        assert stats["samples"] == 3 + 30 + 3
+        assert stats["rewards"] == 3
+        assert sum(stats["selections"].values()) == 13
+        assert stats["arm_rewards"] == {"option1": 2, "option2": 1}
+        assert stats["arm_reward_totals"] == {"option1": 2.0, "option2": 0.0}
+        assert set(stats["latency"]) == {
+            "choose_arm",
+            "choose_arms",
+            "choose_top_k",
+            "add_rewards",
+        }
+        assert stats["latency"]["choose_arm"]["count"] == 1
+        exper.uninstrument().choose_arm()
+        assert metrics.decisions == 12
+
+    def test_shared_with_concurrent_experiment(self):
+        exper = BernoulliExperiment(2)
+        metrics = exper.instrument(Metrics(name="homepage"))
+        with ConcurrentExperiment(exper, flush_size=2) as shared:
+            shared.choose_arm()
+            shared.choose_arms(5)
+            shared.add_rewards_bulk(["option1", "option2"], [1, 1])
+        assert metrics.decisions == 6
+        assert metrics.rewards == 2
+
+    def test_histogram(self):
+        histogram = Histogram([0.1, 1])
+        for value in [0.05, 0.1, 0.5, 2]:
+            histogram.observe(value)
+        assert histogram.cumulative() == [(0.1, 2), (1, 3), (float("inf"), 4)]
+        assert histogram.sum == 2.65 and histogram.count == 4
+
+    def test_prometheus(self):
+        metrics = Metrics(name='a "b"', buckets=[0.5])
+        metrics.observe("choose_arm", 0.25)
+        metrics.record_decisions(["option1"], np.array([3]))
+        metrics.record_rewards(["option1"], [2], [1.5])
+        text = metrics.to_prometheus()
+        assert "# TYPE thompson_sampling_decisions_total counter" in text
+        assert 'thompson_sampling_decisions_total{experiment="a \\"b\\""} 3' in text
+        assert (
+            'thompson_sampling_latency_seconds_bucket{experiment="a \\"b\\"",'
+            'operation="choose_arm",le="+Inf"} 1'
+        ) in text
+        assert 'arm_reward_sum{experiment="a \\"b\\"",arm="option1"} 1.5' in text
+        assert Metrics().to_prometheus().count("thompson_sampling_samples_total 0")
+
+    def test_prometheus_special_values(self):
+        metrics = Metrics()
+        metrics.record_rewards(["A", "B", "C"], [1, 1, 1], [np.inf, -np.inf, np.nan])
+        text = metrics.to_prometheus()
+        assert 'arm_reward_sum{arm="A"} +Inf' in text
+        assert 'arm_reward_sum{arm="B"} -Inf' in text
+        assert 'arm_reward_sum{arm="C"} NaN' in text
@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.exponential import ExponentialExperiment
+from thompson_sampling.poisson import PoissonExperiment
+from thompson_sampling.multi import MultiExperiment
+from thompson_sampling.priors import BetaPrior
+
+
+class TestMultiExperiment:
+    def test_layout(self):
+        multi = MultiExperiment(BernoulliExperiment, experiments=1000, arms=3)
+        assert len(multi) == 1000
+        assert multi.arms == 3
+        assert multi.labels == ["option1", "option2", "option3"]
+        assert multi.params["a"].shape == (1000, 3)
+        assert multi.nbytes == 1000 * 3 * 2 * 8
+        compact = MultiExperiment(BernoulliExperiment, 1000, arms=3, dtype=np.float32)
+        assert compact.nbytes == 1000 * 3 * 2 * 4
+
+    def test_priors_shared_by_rows(self):
+        priors = BetaPrior().add_one(0.5, 0.05, 100, "A").add_one(0.2, 0.01, 50, "B")
+        multi = MultiExperiment(BernoulliExperiment, 4, priors=priors)
+        single = BernoulliExperiment(priors=priors)
+        assert multi.labels == ["A", "B"]
+        assert multi.experiment(3).posteriors == single.posteriors
+
+    @pytest.mark.parametrize(
+        "experiment_class", [BernoulliExperiment, PoissonExperiment]
+    )
+    def test_rewards_match_single_experiments(self, experiment_class):
+        rng = np.random.default_rng(0)
+        ids = rng.integers(0, 5, size=2000)
+        arms = rng.integers(0, 3, size=2000)
+        rewards = rng.integers(0, 2, size=2000)
+        multi = MultiExperiment(experiment_class, 5, arms=3, dtype=np.float64)
+        multi.add_rewards(ids, arms, rewards)
+        for i in range(5):
+            rows = ids == i
+            single = experiment_class(3).add_rewards_bulk(
+                np.array(multi.labels)[arms[rows]], rewards[rows]
+            )
+            assert multi.experiment(i).posteriors == single.posteriors
+
+    def test_choose_arm(self):
+        multi = MultiExperiment(BernoulliExperiment, 3, arms=2, rng=0)
+        multi.add_rewards([0] * 100 + [1] * 100, [0] * 100 + [1] * 100, [1] * 200)
+        multi.add_rewards([0] * 100 + [1] * 100, [1] * 100 + [0] * 100, [0] * 200)
+        choices = multi.choose_arm(np.repeat([0, 1, 2], 1000), max_samples=500)
+        assert choices.shape == (3000,)
+        assert (choices[:1000] == 0).mean() > 0.99
+        assert (choices[1000:2000] == 1).mean() > 0.99
+        assert 0.4 < (choices[2000:] == 0).mean() < 0.6
+        assert multi.choose_arm([0], as_labels=True) == ["option1"]
+
+    def test_minimize(self):
+        multi = MultiExperiment(ExponentialExperiment, 2, arms=2, rng=0)
+        multi.add_rewards([0] * 50 + [1] * 50, [0] * 50 + [1] * 50, [10] * 100)
+        multi.add_rewards([0] * 50 + [1] * 50, [1] * 50 + [0] * 50, [1] * 100)
+        choices = multi.choose_arm([0] * 100 + [1] * 100)
+        # the smallest sampled rate, i.e. the longest durations, wins
+        assert (choices[:100] == 0).all()
+        assert (choices[100:] == 1).all()
+
+    def test_validation(self):
+        multi = MultiExperiment(BernoulliExperiment, 3, arms=2)
+        with pytest.raises(ValueError):
+            multi.choose_arm([3])
+        with pytest.raises(ValueError):
+            multi.add_rewards([0], [2], [1])
+        with pytest.raises(ValueError):
+            multi.add_rewards([0, 1], [0], [1])
+        with pytest.raises(TypeError):
+            MultiExperiment(dict, 3, arms=2)
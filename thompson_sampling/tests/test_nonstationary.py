@@ -0,0 +1,159 @@
+import pytest
+import numpy as np
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.exponential import ExponentialExperiment
+from thompson_sampling.poisson import PoissonExperiment
+from thompson_sampling.nonstationary import (
+    DiscountedExperiment,
+    SlidingWindowExperiment,
+)
+
+
+class TestDiscountedExperiment:
+    def test_matches_sequential_discounting(self):
+        exp = DiscountedExperiment(BernoulliExperiment(2), discount=0.9)
+        labels = ["option1", "option2", "option1", "option1"]
+        rewards = [1, 1, 0, 1]
+        exp.add_rewards_bulk(labels[:1], rewards[:1])
+        exp.add_rewards_bulk(labels[1:], rewards[1:])
+        counts, totals = np.zeros(2), np.zeros(2)
+        for label, reward in zip(labels, rewards):
+            counts, totals = counts * 0.9, totals * 0.9
+            arm = int(label[-1]) - 1
+            counts[arm] += 1
+            totals[arm] += reward
+        posteriors = exp.posteriors
+        assert posteriors["option1"]["a"] == pytest.approx(1 + totals[0])
+        assert posteriors["option1"]["b"] == pytest.approx(1 + counts[0] - totals[0])
+        assert posteriors["option2"]["a"] == pytest.approx(1 + totals[1])
+
+    def test_no_discount_matches_experiment(self):
+        rng = np.random.default_rng(0)
+        labels = rng.choice(["option1", "option2", "option3"], size=500)
+        rewards = rng.poisson(3, size=500)
+        exp = DiscountedExperiment(PoissonExperiment(3), discount=1)
+        exp.add_rewards_bulk(labels, rewards)
+        direct = PoissonExperiment(3).add_rewards_bulk(labels, rewards)
+        assert exp.posteriors == direct.posteriors
+
+    def test_half_life(self):
+        exp = DiscountedExperiment(ExponentialExperiment(1), half_life=60, by="time")
+        exp.add_rewards([{"label": "option1", "reward": 2.0}], timestamps=1000)
+        exp.advance(1060)
+        assert exp.posteriors["option1"]["shape"] == pytest.approx(0.501)
+        exp.advance(1000)
+        assert exp.posteriors["option1"]["shape"] == pytest.approx(0.501)
+
+    def test_renormalization_keeps_values(self):
+        exp = DiscountedExperiment(BernoulliExperiment(2), discount=0.5)
+        exp.add_rewards_bulk(["option1"] * 200, [1] * 200)
+        exp.add_rewards_bulk(["option2"] * 3, [0] * 3)
+        posteriors = exp.posteriors
+        assert posteriors["option1"]["a"] == pytest.approx(1 + 2 * 0.5**3)
+        assert posteriors["option2"]["b"] == pytest.approx(1 + 1.75)
+        assert np.isfinite(exp._counts).all()
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            DiscountedExperiment(BernoulliExperiment(2))
+        with pytest.raises(ValueError):
+            DiscountedExperiment(BernoulliExperiment(2), discount=0.9, half_life=10)
+        with pytest.raises(ValueError):
+            DiscountedExperiment(BernoulliExperiment(2), discount=1.5)
+        with pytest.raises(ValueError):
+            DiscountedExperiment(BernoulliExperiment(2), discount=0.9, by="days")
+
+    def test_advance_then_add_rewards(self):
+        exp = DiscountedExperiment(BernoulliExperiment(2), discount=0.9)
+        exp.add_rewards_bulk(["option1"] * 5, [1] * 5)
+        exp.advance(50)
+        exp.add_rewards_bulk(["option2"], [1])
+        assert exp.posteriors["option2"]["a"] == pytest.approx(2)
+        assert exp.posteriors["option1"]["a"] == pytest.approx(
+            1 + sum(0.9 ** (50 - i) for i in range(5))
+        )
+
+    def test_arm_changes(self):
+        experiment = BernoulliExperiment(3)
+        exp = DiscountedExperiment(experiment, discount=1)
+        exp.add_rewards_bulk(["option1", "option2", "option3"], [1, 0, 1])
+        experiment.remove_arm("option1")
+        experiment.add_arm("warm", {"a": 5, "b": 5})
+        exp.add_rewards_bulk(["option3", "warm"], [1, 0])
+        assert dict(exp.posteriors) == {
+            "option3": {"a": 3, "b": 1},
+            "option2": {"a": 1, "b": 2},
+            "warm": {"a": 5, "b": 6},
+        }
+        exp.remove_arm("option2").add_arm("cold")
+        assert exp.posteriors["cold"] == {"a": 1, "b": 1}
+        assert exp.posteriors["option3"] == {"a": 3, "b": 1}
+
+    def test_tracks_drift(self):
+        exp = DiscountedExperiment(
+            BernoulliExperiment(2, rng=np.random.default_rng(0)), discount=0.99
+        )
+        exp.add_rewards_bulk(["option1"] * 1000, [1] * 1000)
+        exp.add_rewards_bulk(["option2"] * 1000, [1] * 1000)
+        exp.add_rewards_bulk(["option1"] * 1000, [0] * 1000)
+        assert exp.choose_arm() == "option2"
+
+
+class TestSlidingWindowExperiment:
+    def test_events_window(self):
+        exp = SlidingWindowExperiment(BernoulliExperiment(2), window=10, buckets=5)
+        exp.add_rewards_bulk(["option1"] * 10, [1] * 10)
+        assert exp.posteriors["option1"]["a"] == 11
+        exp.add_rewards_bulk(["option2"] * 4, [0] * 4)
+        # the two oldest buckets, events 0 to 3, have left the window
+        assert exp.posteriors["option1"]["a"] == 7
+        assert exp.posteriors["option2"]["b"] == 5
+        exp.add_rewards_bulk(["option2"] * 20, [1] * 20)
+        assert exp.posteriors["option1"]["a"] == 1
+        assert exp.posteriors["option2"]["a"] == 11
+
+    def test_advance_then_add_rewards(self):
+        exp = SlidingWindowExperiment(BernoulliExperiment(2), window=10, buckets=5)
+        exp.add_rewards_bulk(["option1"] * 5, [1] * 5)
+        exp.advance(50)
+        exp.add_rewards_bulk(["option2"] * 3, [1] * 3)
+        assert exp.posteriors["option2"]["a"] == 4
+        assert exp.posteriors["option1"]["a"] == 1
+
+    def test_arm_changes(self):
+        experiment = PoissonExperiment(2)
+        exp = SlidingWindowExperiment(experiment, window=10, buckets=5)
+        exp.add_rewards_bulk(["option1", "option2"], [3, 4])
+        exp.remove_arm("option1")
+        exp.add_arm("new")
+        exp.add_rewards_bulk(["new"] * 9, [1] * 9)
+        assert list(exp.posteriors) == ["option2", "new"]
+        # events 0 and 1 have left the window
+        assert exp.posteriors["option2"]["shape"] == pytest.approx(0.001)
+        assert exp.posteriors["new"]["shape"] == pytest.approx(9.001)
+        np.testing.assert_array_equal(exp._bucket_counts.sum(axis=0), [0, 9])
+
+    def test_time_window(self):
+        exp = SlidingWindowExperiment(
+            PoissonExperiment(2), window=100, buckets=10, by="time"
+        )
+        exp.add_rewards_bulk(["option1", "option2"], [3, 4], timestamps=[1000, 1050])
+        exp.add_rewards([{"label": "option1", "reward": 5}], timestamps=1095)
+        assert exp.posteriors["option1"]["shape"] == pytest.approx(8.001)
+        exp.advance(1105)
+        assert exp.posteriors["option1"]["shape"] == pytest.approx(5.001)
+        assert exp.posteriors["option2"]["shape"] == pytest.approx(4.001)
+        # arrivals older than the window are ignored
+        exp.add_rewards([{"label": "option2", "reward": 7}], timestamps=900)
+        assert exp.posteriors["option2"]["shape"] == pytest.approx(4.001)
+        exp.advance(2000)
+        assert exp.posteriors["option1"]["shape"] == pytest.approx(0.001)
+        assert exp.posteriors["option1"]["scale"] == 1000
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            SlidingWindowExperiment(BernoulliExperiment(2), window=0)
+        with pytest.raises(ValueError):
+            SlidingWindowExperiment(BernoulliExperiment(2), window=10).add_rewards_bulk(
+                ["option1"], [1, 0]
+            )
@@ -0,0 +1,102 @@
+import pytest
+import numpy as np
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.pending import PendingExperiment
+from thompson_sampling.poisson import PoissonExperiment
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPendingExperiment:
+    def test_ids_are_sequential(self):
+        exp = PendingExperiment(BernoulliExperiment(arms=3, rng=0))
+        first, label = exp.choose_arm()
+        ids, labels = exp.choose_arms(4)
+        assert first == 0 and ids.tolist() == [1, 2, 3, 4]
+        assert {label, *labels} <= {"option1", "option2", "option3"}
+        assert exp.pending == 5
+        assert sum(exp.pending_by_arm.values()) == 5
+
+    def test_join_applies_rewards_once(self):
+        exp = PendingExperiment(BernoulliExperiment(arms=2, rng=0))
+        ids, labels = exp.choose_arms(3)
+        joined = exp.join([ids[0], ids[1], ids[0], 99, -1], [1, 0, 0, 1, 1])
+        assert joined == 2
+        assert exp.pending == 1
+        posteriors = exp.posteriors
+        assert posteriors[labels[0]]["a"] >= 2
+        assert sum(p["a"] + p["b"] for p in posteriors.values()) == 6
+        assert exp.join([ids[0]], [1]) == 0
+        with pytest.raises(ValueError):
+            exp.join([ids[2]], [1, 0])
+
+    def test_ttl_eviction(self):
+        clock = FakeClock()
+        exp = PendingExperiment(BernoulliExperiment(arms=2), ttl=10, clock=clock)
+        old, _ = exp.choose_arms(3)
+        clock.now = 5
+        exp.join([old[0]], [1])
+        new, _ = exp.choose_arms(2)
+        clock.now = 12
+        assert exp.expire() == 2
+        assert exp.pending == 2
+        assert exp.join(old, [1, 1, 1]) == 0
+        assert exp.join(new, [1, 1]) == 2
+        assert exp.pending == 0
+
+    def test_store_stays_compact(self):
+        clock = FakeClock()
+        exp = PendingExperiment(BernoulliExperiment(arms=2), ttl=1, clock=clock)
+        for t in range(200):
+            clock.now = t
+            ids, _ = exp.choose_arms(10)
+        assert ids[-1] == 1999
+        assert len(exp._arms) <= 64
+        assert exp.join(ids, np.ones(10)) == 10
+
+    def test_zero_imputation_spreads_bursts(self):
+        experiment = BernoulliExperiment(arms=2, rng=0)
+        experiment.add_rewards([{"label": "option1", "reward": 1}] * 5)
+        plain = PendingExperiment(experiment)
+        for _ in range(50):
+            plain.choose_arm()
+        imputed = PendingExperiment(experiment, impute="zero")
+        for _ in range(50):
+            imputed.choose_arm()
+        assert imputed.pending_by_arm.get("option2", 0) > plain.pending_by_arm.get(
+            "option2", 0
+        )
+        assert experiment.posteriors["option1"] == {"a": 6, "b": 1}
+
+    def test_imputed_gamma_posterior(self):
+        exp = PendingExperiment(PoissonExperiment(arms=2, rng=0), impute="mean")
+        exp.experiment.add_rewards([{"label": "option1", "reward": 3}] * 5)
+        ids, labels = exp.choose_arms(20)
+        assert len(labels) == 20
+        assert exp.join(ids, np.full(20, 3)) == 20
+
+    def test_removed_arm(self):
+        experiment = BernoulliExperiment(arms=3, rng=0)
+        exp = PendingExperiment(experiment)
+        ids, labels = exp.choose_arms(30)
+        removed = labels[0]
+        experiment.remove_arm(removed)
+        experiment.add_arm("option4")
+        more, more_labels = exp.choose_arms(10)
+        assert removed not in more_labels
+        kept = sum(label != removed for label in labels)
+        assert exp.join(ids, np.ones(30)) == kept
+        assert exp.join(more, np.ones(10)) == 10
+        assert exp.pending == 0
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            PendingExperiment(BernoulliExperiment(arms=2), impute="median")
+        with pytest.raises(ValueError):
+            PendingExperiment(BernoulliExperiment(arms=2), ttl=0)
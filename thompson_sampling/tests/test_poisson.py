@@ -1,14 +1,16 @@
 import pytest
+from collections.abc import Mapping
 from thompson_sampling.poisson import PoissonExperiment
 from thompson_sampling.priors import GammaPrior
 from pandas import Series
+import numpy as np
 
 
 class TestPoissonExperiment:
     def test_init_arms(self):
         exper = PoissonExperiment(3)
         assert len(exper.posteriors) == 3
-        assert isinstance(exper.posteriors, dict)
+        assert isinstance(exper.posteriors, Mapping)
         for k, _ in exper.posteriors.items():
             assert isinstance(exper.posteriors[k], dict)
             assert exper.posteriors[k] == {"shape": 0.001, "scale": 1000}
@@ -28,17 +30,58 @@ class TestPoissonExperiment:
         exper.add_rewards(
             [{"label": "option1", "reward": 100}, {"label": "option2", "reward": 200}]
         )
-        assert exper.posteriors == {
-            "option1": {"shape": 100.001, "scale": 0.999},
-            "option2": {"shape": 200.001, "scale": 0.999},
-            "option3": {"shape": 0.001, "scale": 1000},
-        }
+        for label, shape in [("option1", 100.001), ("option2", 200.001)]:
+            assert exper.posteriors[label] == pytest.approx(
+                {"shape": shape, "scale": 1 / 1.001}
+            )
+        assert exper.posteriors["option3"] == {"shape": 0.001, "scale": 1000}
+
+    def test_add_rewards_bulk(self):
+        labels = np.random.choice(["option1", "option2"], size=200)
+        rewards = np.random.poisson(3.0, size=200)
+        exper = PoissonExperiment(3).add_rewards_bulk(labels, rewards)
+        shape = 0.001 + rewards[labels == "option1"].sum()
+        scale = 1 / (1 / 1000 + (labels == "option1").sum())
+        assert exper.posteriors["option1"] == pytest.approx(
+            {"shape": shape, "scale": scale}
+        )
+        assert exper.posteriors["option3"] == {"shape": 0.001, "scale": 1000}
+
+    def test_high_volume_updates_stay_exact(self):
+        exper = PoissonExperiment(2)
+        for _ in range(10):
+            exper.add_rewards_bulk(np.full(100000, "option1"), np.ones(100000))
+        assert exper.posteriors["option1"] == pytest.approx(
+            {"shape": 0.001 + 10**6, "scale": 1 / (0.001 + 10**6)}, rel=1e-12
+        )
 
     def test_pull_arm(self):
         exper = PoissonExperiment(3)
         assert exper.choose_arm() in [key for key, _ in exper.posteriors.items()]
 
+    def test_choose_top_k(self):
+        exper = PoissonExperiment(arms=3)
+        exper._store.params["shape"][:] = [1000, 1000, 1000]
+        exper._store.params["rate"][:] = [100, 10, 1000]
+        assert exper.choose_top_k(3) == ["option2", "option1", "option3"]
+
     def test_get_ppd(self):
         exper = PoissonExperiment(3)
         assert isinstance(exper.get_ppd(size=10000), list)
         assert len(exper.get_ppd(size=1000)) == len(exper.posteriors)
+
+    def test_get_ppd_samples(self):
+        exper = PoissonExperiment(3)
+        ppd, samples = exper.get_ppd(size=500, return_samples=True)
+        assert len(ppd) == 3
+        assert samples.shape == (3, 500)
+
+    def test_get_ppd_analytic(self):
+        exper = PoissonExperiment(3)
+        ppd = exper.get_ppd(analytic=True)
+        assert len(ppd) == 3
+        assert sum(stats["Probability Best"] for stats in ppd) == pytest.approx(1)
+        with pytest.raises(ValueError):
+            exper.get_ppd()
+        exper.add_rewards([{"label": "option1", "reward": 100}])
+        assert exper.get_ppd(analytic=True)[0]["mean"] == round(100.001 * 0.999, 3)
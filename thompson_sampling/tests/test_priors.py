@@ -1,6 +1,9 @@
 import pytest
+from collections.abc import Mapping
+import numpy as np
 from thompson_sampling.priors import BetaPrior, GammaPrior
 from pandas import Series
+from thompson_sampling.bernoulli import BernoulliExperiment
 
 
 class TestBetaPrior:
@@ -8,7 +11,7 @@ class TestBetaPrior:
         gen = BetaPrior()
         gen.add_one(mean=0.5, variance=0.2, effective_size=10, label="option1")
         assert len(gen.priors) == 1
-        assert isinstance(gen.priors, dict)
+        assert isinstance(gen.priors, Mapping)
         assert isinstance(gen.priors["option1"], dict)
         assert gen.priors == {"option1": {"a": 5, "b": 5}}
 
@@ -50,6 +53,44 @@ class TestBetaPrior:
         with pytest.raises(ValueError):
             gen.add_multiple(means, variances, effective_sizes, labels)
 
+    def test_add_multiple_reports_every_invalid_row(self):
+        gen = BetaPrior()
+        with pytest.raises(ValueError) as error:
+            gen.add_multiple(
+                [0.5, 1.5, 0.5, -0.1],
+                [0.1, 0.1, 0.3, 0.1],
+                [10, 10, 10, 0],
+                ["ok", "bad_mean", "bad_variance", "bad_both"],
+            )
+        message = str(error.value)
+        assert "mean must be in (0,1) for ['bad_mean', 'bad_both']" in message
+        assert "effective_size must be greater then 0 for ['bad_both']" in message
+        assert "bad_variance" in message and "'ok'" not in message
+        assert len(gen.priors) == 0
+
+    def test_add_multiple_vectorized(self):
+        size = 100000
+        gen = BetaPrior().add_multiple(
+            np.full(size, 0.2), np.full(size, 0.02), np.full(size, 10), range(size)
+        )
+        assert len(gen.priors) == size
+        np.testing.assert_array_equal(gen._store.params["a"], 2)
+        exper = BernoulliExperiment(priors=gen)
+        assert exper.posteriors[size - 1] == {"a": 2, "b": 8}
+        exper.add_rewards([{"label": 0, "reward": 1}])
+        assert gen.priors[0] == {"a": 2, "b": 8}
+
+    def test_add_overwrites_existing_labels(self):
+        gen = BetaPrior().add_one(0.5, 0.2, 10, "option1")
+        gen.add_multiple(
+            [0.2, 0.5, 0.2],
+            [0.02, 0.2, 0.02],
+            [10, 10, 20],
+            ["option2", "option1", "option2"],
+        )
+        assert list(gen.priors) == ["option1", "option2"]
+        assert gen.priors["option2"] == {"a": 4, "b": 16}
+
 
 class TestGammaPrior:
     def test_add_one_success(self):
@@ -61,7 +102,7 @@ class TestGammaPrior:
         for i, item in enumerate(params):
             gen.add_one(label=f"option{i}", **item)
         assert len(gen.priors) == 2
-        assert isinstance(gen.priors, dict)
+        assert isinstance(gen.priors, Mapping)
         assert isinstance(gen.priors["option1"], dict)
         assert gen.priors == {
             "option0": {"shape": 500, "scale": 0.2},
@@ -106,3 +147,18 @@ class TestGammaPrior:
         labels = Series(["option1", "option2", "option3"])
         with pytest.raises(ValueError):
             gen.add_multiple(means, variances, effective_sizes, labels)
+
+    def test_add_multiple_missing_values(self):
+        gen = GammaPrior()
+        with pytest.raises(ValueError) as error:
+            gen.add_multiple(
+                [100, 100, -5, 100],
+                [20, None, None, float("nan")],
+                [None, None, 10, 0],
+                ["ok", "missing", "negative", "zero"],
+            )
+        message = str(error.value)
+        assert "Parameters must be positive for ['negative', 'zero']" in message
+        assert "Must specify either variance or effective size for ['missing']" in (
+            message
+        )
@@ -0,0 +1,46 @@
+import pytest
+import threading
+import numpy as np
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.poisson import PoissonExperiment
+from thompson_sampling.rng import ThreadLocalGenerator, spawn_generators
+
+
+class TestGenerators:
+    def test_seeded_experiments_replay(self):
+        first = BernoulliExperiment(arms=5, rng=42)
+        second = BernoulliExperiment(arms=5, rng=42)
+        assert first.choose_arms(100) == second.choose_arms(100)
+        assert [first.choose_arm() for _ in range(20)] == [
+            second.choose_arm() for _ in range(20)
+        ]
+        assert first.get_ppd(size=100) == second.get_ppd(size=100)
+
+    def test_reseed(self):
+        exper = PoissonExperiment(arms=3, rng=1)
+        expected = exper.get_ppd(size=100)
+        assert exper.reseed(1).get_ppd(size=100) == expected
+
+    def test_spawn_generators(self):
+        streams = spawn_generators(7, n=3)
+        replay = spawn_generators(7, n=3)
+        draws = [rng.random(5) for rng in streams]
+        assert not np.array_equal(draws[0], draws[1])
+        for rng, drawn in zip(replay, draws):
+            np.testing.assert_array_equal(rng.random(5), drawn)
+
+    def test_thread_local_generator(self):
+        generators = ThreadLocalGenerator(3)
+        seen = []
+
+        def worker():
+            rng = generators.get()
+            assert generators.get() is rng
+            seen.append(rng)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({id(rng) for rng in seen}) == 4
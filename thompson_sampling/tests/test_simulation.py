@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.exponential import ExponentialExperiment
+from thompson_sampling.poisson import PoissonExperiment
+from thompson_sampling.priors import BetaPrior, GammaPrior
+from thompson_sampling.simulation import SimulationResult, simulate
+
+
+class TestSimulate:
+    def test_bernoulli_converges(self):
+        result = simulate(
+            BernoulliExperiment, [0.1, 0.5], horizon=200, replications=500, seed=0
+        )
+        assert result.regret.shape == (200,)
+        assert result.shares.shape == (200, 2)
+        assert result.final_regret.shape == (500,)
+        assert np.all(np.diff(result.regret) >= 0)
+        np.testing.assert_allclose(result.shares.sum(axis=1), 1)
+        assert result.shares[-1, 1] > 0.95
+        assert result.regret[-1] == pytest.approx(result.final_regret.mean())
+
+    @pytest.mark.parametrize(
+        "experiment_class, truth, best",
+        [(PoissonExperiment, [2, 5], 1), (ExponentialExperiment, [2, 0.5], 1)],
+    )
+    def test_gamma_environments(self, experiment_class, truth, best):
+        # the default Gamma(0.001, 1000) prior locks onto whichever arm pays
+        # first, so start from a weakly informative prior around the truth
+        priors = GammaPrior().add_multiple([1, 1], [None, None], [1, 1], ["A", "B"])
+        result = simulate(experiment_class, truth, 100, 200, priors=priors, seed=0)
+        assert result.shares[-1, best] > 0.9
+
+    def test_seed_and_batches(self):
+        first = simulate(BernoulliExperiment, [0.2, 0.3], 50, 100, batch_size=4, seed=1)
+        second = simulate(
+            BernoulliExperiment, [0.2, 0.3], 50, 100, batch_size=4, seed=1
+        )
+        np.testing.assert_array_equal(first.regret, second.regret)
+        assert first.regret[0] == pytest.approx(4 * 0.1 * first.shares[0, 0])
+
+    def test_drifting_truth_and_discount(self):
+        truth = np.array([[0.8, 0.2]] * 100 + [[0.2, 0.8]] * 100)
+        kept = simulate(BernoulliExperiment, truth, replications=200, seed=0)
+        forgot = simulate(
+            BernoulliExperiment, truth, replications=200, discount=0.9, seed=0
+        )
+        assert forgot.shares[-1, 1] > kept.shares[-1, 1]
+        assert forgot.regret[-1] < kept.regret[-1]
+
+    def test_discount_of_one_changes_nothing(self):
+        args = (BernoulliExperiment, [0.2, 0.3], 30, 50)
+        plain = simulate(*args, batch_size=4, seed=2)
+        discounted = simulate(*args, batch_size=4, discount=1, seed=2)
+        np.testing.assert_array_equal(plain.regret, discounted.regret)
+
+    def test_priors(self):
+        priors = (
+            BetaPrior().add_one(0.9, 0.001, 1000, "A").add_one(0.1, 0.001, 1000, "B")
+        )
+        result = simulate(BernoulliExperiment, [0.1, 0.9], 20, 50, priors=priors)
+        assert result.labels == ["A", "B"]
+        assert result.shares[:, 0].mean() > 0.9
+
+    def test_workers(self):
+        result = simulate(
+            BernoulliExperiment, [0.1, 0.5], 20, replications=101, seed=0, workers=2
+        )
+        assert result.final_regret.shape == (101,)
+        assert result.regret[-1] == pytest.approx(result.final_regret.mean())
+
+    def test_merge_weights_by_replications(self):
+        left = SimulationResult(["A"], [1.0], [[1.0]], [1.0])
+        right = SimulationResult(["A"], [4.0], [[1.0]], [4.0, 4.0, 4.0])
+        assert SimulationResult.merge([left, right]).regret.tolist() == [3.25]
+
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            simulate(BernoulliExperiment, np.zeros((3, 2)), horizon=5)
+        with pytest.raises(TypeError):
+            simulate(dict, [0.1, 0.2], horizon=5)
@@ -0,0 +1,99 @@
+import pytest
+import os
+import numpy as np
+from thompson_sampling.base import BaseThompsonSampling
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.exponential import ExponentialExperiment
+from thompson_sampling.poisson import PoissonExperiment
+from thompson_sampling.priors import GammaPrior
+from thompson_sampling.snapshot import read_header
+from thompson_sampling.store import PosteriorStore
+
+
+class TestSnapshot:
+    def test_roundtrip(self, tmp_path):
+        for cls in [BernoulliExperiment, PoissonExperiment, ExponentialExperiment]:
+            exper = cls(arms=4)
+            exper.add_rewards_bulk(["option1", "option3", "option3"], [1, 0, 1])
+            path = tmp_path / f"{cls.__name__}.snap"
+            exper.save(path)
+            restored = BaseThompsonSampling.load(path)
+            assert type(restored) is cls
+            assert restored.posteriors == exper.posteriors
+            assert restored.choose_arm() in exper.posteriors
+
+    def test_integer_labels(self, tmp_path):
+        prior = GammaPrior()
+        prior.add_one(mean=100, variance=20, effective_size=None, label=7)
+        prior.add_one(mean=50, variance=20, effective_size=None, label=9)
+        PoissonExperiment(priors=prior).save(tmp_path / "ints.snap")
+        restored = PoissonExperiment.load(tmp_path / "ints.snap")
+        assert list(restored.posteriors) == [7, 9]
+
+    def test_scale_snapshot(self, tmp_path):
+        # Gamma posteriors used to be stored as shape and scale
+        exper = PoissonExperiment(arms=2)
+        exper._store = PosteriorStore(
+            exper._store.labels, {"shape": [2, 3], "scale": [0.5, 0.25]}
+        )
+        exper.save(tmp_path / "old.snap")
+        restored = PoissonExperiment.load(tmp_path / "old.snap", mmap_mode=None)
+        assert restored.posteriors["option2"] == {"shape": 3, "scale": 0.25}
+        restored.add_rewards_bulk(["option1"], [4])
+        assert restored.posteriors["option1"] == {"shape": 6, "scale": 1 / 3}
+
+    def test_unknown_class(self, tmp_path):
+        path = tmp_path / "state.snap"
+        BernoulliExperiment(arms=2).save(path)
+        # same length, so the section offsets in the header stay valid
+        recorded = b'"thompson_sampling.bernoulli:BernoulliExperiment"'
+        crafted = b'"os:system"'.ljust(len(recorded))
+        path.write_bytes(path.read_bytes().replace(recorded, crafted))
+        with pytest.raises(ValueError, match="os:system"):
+            BaseThompsonSampling.load(path)
+
+    def test_mismatched_class(self, tmp_path):
+        path = tmp_path / "state.snap"
+        # Poisson and Exponential snapshots share the shape/rate layout
+        PoissonExperiment(arms=2).save(path)
+        with pytest.raises(ValueError, match="PoissonExperiment.*Exponential"):
+            ExponentialExperiment.load(path)
+        with pytest.raises(ValueError, match="PoissonExperiment.*Bernoulli"):
+            BernoulliExperiment.load(path)
+
+    def test_mismatched_parameters(self, tmp_path):
+        path = tmp_path / "state.snap"
+        exper = PoissonExperiment(arms=2)
+        exper._store = PosteriorStore(exper._store.labels, {"a": [1, 1], "b": [1, 1]})
+        exper.save(path)
+        with pytest.raises(ValueError, match=r"\['a', 'b'\].*\['rate', 'shape'\]"):
+            PoissonExperiment.load(path)
+
+    def test_memory_map_modes(self, tmp_path):
+        path = tmp_path / "state.snap"
+        BernoulliExperiment(arms=2).save(path)
+        shared = BernoulliExperiment.load(path)
+        assert isinstance(shared._store.params["a"].base, np.memmap)
+        with pytest.raises(ValueError):
+            shared.add_rewards_bulk(["option1"], [1])
+        private = BernoulliExperiment.load(path, mmap_mode="c")
+        private.add_rewards_bulk(["option1"], [1])
+        assert private.posteriors["option1"] == {"a": 2, "b": 1}
+        in_memory = BernoulliExperiment.load(path, mmap_mode=None)
+        assert in_memory.posteriors["option1"] == {"a": 1, "b": 1}
+
+    def test_atomic_overwrite(self, tmp_path):
+        path = tmp_path / "state.snap"
+        exper = BernoulliExperiment(arms=2)
+        exper.save(path)
+        exper.add_rewards_bulk(["option2"], [1])
+        exper.save(path)
+        assert os.listdir(tmp_path) == ["state.snap"]
+        assert BernoulliExperiment.load(path).posteriors == exper.posteriors
+        assert read_header(path)["arms"] == 2
+
+    def test_not_a_snapshot(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"x" * 64)
+        with pytest.raises(ValueError):
+            BaseThompsonSampling.load(path)
@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+from pandas import DataFrame
+from thompson_sampling.exponential import ExponentialExperiment
+from thompson_sampling.poisson import PoissonExperiment
+from thompson_sampling.statistics import (
+    BernoulliStatistics,
+    ExponentialStatistics,
+    PoissonStatistics,
+    SufficientStatistics,
+    _shard_from_csv,
+    ingest_parallel,
+)
+
+
+def outcomes(size=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = rng.choice(["option1", "option2", "option3"], size=size)
+    return labels, rng.poisson(3, size=size)
+
+
+class TestSufficientStatistics:
+    def test_merge_matches_direct_update(self):
+        labels, rewards = outcomes()
+        stats = PoissonStatistics.from_rewards(labels[:400], rewards[:400])
+        stats += PoissonStatistics.from_rewards(labels[400:], rewards[400:])
+        assert stats == PoissonStatistics.from_rewards(labels, rewards)
+        merged = stats.apply_to(PoissonExperiment(3))
+        direct = PoissonExperiment(3).add_rewards_bulk(labels, rewards)
+        assert merged.posteriors == direct.posteriors
+
+    def test_merge_disjoint_labels(self):
+        left = BernoulliStatistics(["A"], [2], [1])
+        right = BernoulliStatistics(["B"], [3], [3])
+        merged = left + right
+        assert merged.labels == ["A", "B"]
+        assert merged.counts.tolist() == [2, 3]
+        assert merged.totals.tolist() == [1, 3]
+        assert left.merge(BernoulliStatistics()) is left
+
+    def test_type_checks(self):
+        with pytest.raises(TypeError):
+            BernoulliStatistics() + PoissonStatistics()
+        with pytest.raises(TypeError):
+            BernoulliStatistics().apply_to(PoissonExperiment(2))
+        with pytest.raises(ValueError):
+            BernoulliStatistics(["A"], [1, 2], [1])
+
+    def test_for_experiment(self):
+        assert (
+            SufficientStatistics.for_experiment(ExponentialExperiment(2))
+            is ExponentialStatistics
+        )
+
+
+class TestIngestParallel:
+    def test_dataframe(self):
+        labels, rewards = outcomes()
+        frame = DataFrame({"label": labels, "reward": rewards})
+        parallel = ingest_parallel(PoissonExperiment(3), frame, workers=3)
+        direct = PoissonExperiment(3).add_rewards_bulk(labels, rewards)
+        assert parallel.posteriors == direct.posteriors
+
+    def test_csv(self, tmp_path):
+        labels, rewards = outcomes(size=997)
+        path = tmp_path / "rewards.csv"
+        DataFrame({"reward": rewards, "label": labels}).to_csv(path, index=False)
+        for workers in [1, 4, 7]:
+            parallel = ingest_parallel(PoissonExperiment(3), path, workers=workers)
+            direct = PoissonExperiment(3).add_rewards_bulk(labels, rewards)
+            assert parallel.posteriors == direct.posteriors
+
+    def test_csv_chunks(self, tmp_path):
+        labels, rewards = outcomes(size=997)
+        path = tmp_path / "rewards.csv"
+        DataFrame({"label": labels, "reward": rewards}).to_csv(path, index=False)
+        size = path.stat().st_size
+        shards = [
+            _shard_from_csv(
+                PoissonStatistics, path, start, stop, "label", "reward", chunksize=64
+            )
+            for start, stop in [(0, size // 3), (size // 3, size)]
+        ]
+        assert sum(shards, PoissonStatistics()) == PoissonStatistics.from_rewards(
+            labels, rewards
+        )
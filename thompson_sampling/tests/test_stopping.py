@@ -0,0 +1,69 @@
+import pytest
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.exponential import ExponentialExperiment
+from thompson_sampling.stopping import (
+    beta_greater,
+    beta_two_arm,
+    evaluate,
+    monte_carlo,
+    should_stop,
+)
+
+
+def two_arm_experiment():
+    exper = BernoulliExperiment(2)
+    exper.add_rewards_bulk(
+        ["option1"] * 100 + ["option2"] * 100,
+        [1] * 30 + [0] * 70 + [1] * 35 + [0] * 65,
+    )
+    return exper
+
+
+class TestBetaTwoArm:
+    def test_symmetric(self):
+        assert beta_greater(3, 5, 3, 5) == pytest.approx(0.5)
+
+    def test_non_integer_alpha(self):
+        # quadrature path on the left, exact sum on the right
+        total = beta_greater(3, 5, 3.5, 5) + beta_greater(3.5, 5, 3, 5)
+        assert total == pytest.approx(1, abs=1e-6)
+
+    def test_matches_monte_carlo(self):
+        exper = two_arm_experiment()
+        exact = evaluate(exper)
+        simulated = evaluate(exper, exact=False, tolerance=5e-4, budget=10**6)
+        for e, s in zip(exact, simulated):
+            assert e["Probability Best"] == pytest.approx(
+                s["Probability Best"], abs=5e-3
+            )
+            assert e["Expected Loss"] == pytest.approx(s["Expected Loss"], abs=1e-3)
+
+    def test_loss(self):
+        prob, loss = beta_two_arm(1000, 1, 1, 1000)
+        assert prob[0] == pytest.approx(1)
+        assert loss[0] == pytest.approx(0, abs=1e-9)
+        assert loss[1] == pytest.approx(1000 / 1001 - 1 / 1001, abs=1e-6)
+
+
+class TestMonteCarlo:
+    def test_early_exit(self):
+        exper = BernoulliExperiment(3)
+        exper._store.params["a"][:] = [1, 1000, 1]
+        exper._store.params["b"][:] = [1000, 1, 1000]
+        prob, loss, draws = monte_carlo(exper, budget=10**6, batch_size=1000)
+        assert draws == 1000
+        assert prob.tolist() == [0, 1, 0]
+
+    def test_minimize(self):
+        exper = ExponentialExperiment(2)
+        exper._store.params["shape"][:] = [1000, 1000]
+        exper._store.params["rate"][:] = [100, 10000]
+        prob, loss, _ = monte_carlo(exper)
+        assert prob.tolist() == [0, 1]
+        assert loss[1] == 0
+        assert loss[0] == pytest.approx(10 - 0.1, rel=0.01)
+
+    def test_should_stop(self):
+        exper = two_arm_experiment()
+        assert should_stop(exper, 0.01) == (True, "option2")
+        assert should_stop(exper, 0.001) == (False, "option2")
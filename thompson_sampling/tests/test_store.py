@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+from thompson_sampling.store import PosteriorStore
+
+
+class TestPosteriorStore:
+    def test_from_default(self):
+        store = PosteriorStore.from_default(["A", "B"], {"a": 1, "b": 1})
+        assert len(store) == 2
+        assert store.params["a"].dtype == np.float64
+        assert store.row("B") == {"a": 1.0, "b": 1.0}
+
+    def test_from_dicts(self):
+        store = PosteriorStore.from_dicts(
+            {"A": {"shape": 2, "scale": 0.5}, "B": {"shape": 3, "scale": 0.25}}
+        )
+        assert store.labels == ["A", "B"]
+        np.testing.assert_array_equal(store.params["shape"], [2, 3])
+        np.testing.assert_array_equal(store.params["scale"], [0.5, 0.25])
+
+    def test_duplicate_labels(self):
+        with pytest.raises(ValueError):
+            PosteriorStore(["A", "A"], {"a": [1, 1]})
+
+    def test_lookup(self):
+        store = PosteriorStore.from_default(["A", "B", "C"], {"a": 1})
+        np.testing.assert_array_equal(store.lookup(["C", "A", "C"]), [2, 0, 2])
+        with pytest.raises(KeyError):
+            store.lookup(["D"])
+
+    def test_view(self):
+        store = PosteriorStore.from_default(["A", "B"], {"a": 1, "b": 1})
+        view = store.view()
+        store.params["a"][0] += 1
+        assert view == {"A": {"a": 2, "b": 1}, "B": {"a": 1, "b": 1}}
+        assert list(view) == ["A", "B"]
+        with pytest.raises(KeyError):
+            view["C"]
+
+    def test_append_and_remove(self):
+        store = PosteriorStore.from_default(["A", "B", "C"], {"a": 1, "b": 2})
+        store.append("D", {"a": 3, "b": 4})
+        assert store.labels == ["A", "B", "C", "D"]
+        assert store.row("D") == {"a": 3.0, "b": 4.0}
+        store.remove("A")
+        assert store.labels == ["D", "B", "C"]
+        assert store.positions(["D", "C"]).tolist() == [0, 2]
+        np.testing.assert_array_equal(store.params["a"], [3, 1, 1])
+        store.remove("C")
+        assert store.labels == ["D", "B"]
+        assert "C" not in store and len(store.params["b"]) == 2
+        with pytest.raises(KeyError):
+            store.remove("C")
+        with pytest.raises(ValueError):
+            store.append("B", {"a": 1, "b": 1})
+        with pytest.raises(ValueError):
+            store.append("E", {"a": 1})
+
+    def test_append_reuses_capacity(self):
+        store = PosteriorStore.from_default([], {"a": 1})
+        buffers = []
+        for i in range(100):
+            store.append(i, {"a": i})
+            buffers.append(store._buffers["a"])
+        assert len({id(buffer) for buffer in buffers}) == 5
+        np.testing.assert_array_equal(store.params["a"], np.arange(100))
+        store.remove(0)
+        store.append(100, {"a": 100})
+        assert store._buffers["a"] is buffers[-1]
+        assert store.params["a"][0] == 99 and store.params["a"][-1] == 100
@@ -0,0 +1,102 @@
+import pytest
+import io
+import json
+import numpy as np
+from pandas import DataFrame
+from thompson_sampling.bernoulli import BernoulliExperiment
+from thompson_sampling.poisson import PoissonExperiment
+from thompson_sampling.streaming import ingest_stream, iter_reward_chunks, resume_stream
+
+
+def outcomes(size=250, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = rng.choice(["option1", "option2", "option3"], size=size)
+    return labels, rng.binomial(1, 0.4, size=size)
+
+
+def expected(labels, rewards):
+    return BernoulliExperiment(3).add_rewards_bulk(labels, rewards).posteriors
+
+
+class TestStreaming:
+    def test_csv_file(self, tmp_path):
+        labels, rewards = outcomes()
+        path = tmp_path / "rewards.csv"
+        DataFrame({"reward": rewards, "label": labels}).to_csv(path, index=False)
+        exper = BernoulliExperiment(3).add_rewards_stream(path, chunksize=32)
+        assert exper.posteriors == expected(labels, rewards)
+
+    def test_jsonl_file_object(self):
+        labels, rewards = outcomes()
+        lines = "".join(
+            json.dumps({"label": l, "reward": int(r)}) + "\n"
+            for l, r in zip(labels, rewards)
+        )
+        exper = ingest_stream(BernoulliExperiment(3), io.StringIO(lines), chunksize=50)
+        assert exper.posteriors == expected(labels, rewards)
+
+    def test_iterators(self):
+        labels, rewards = outcomes()
+        pairs = iter(zip(labels.tolist(), rewards.tolist()))
+        dicts = ({"label": l, "reward": r} for l, r in zip(labels, rewards))
+        for source in [pairs, dicts]:
+            exper = BernoulliExperiment(3).add_rewards_stream(source, chunksize=7)
+            assert exper.posteriors == expected(labels, rewards)
+
+    def test_chunk_offsets(self, tmp_path):
+        path = tmp_path / "rewards.jsonl"
+        path.write_text(
+            "".join(json.dumps({"label": "A", "reward": i}) + "\n" for i in range(10))
+        )
+        chunks = list(iter_reward_chunks(path, chunksize=4))
+        assert [len(labels) for labels, _, _ in chunks] == [4, 4, 2]
+        _, rewards, _ = next(iter_reward_chunks(path, chunksize=4, offset=chunks[0][2]))
+        assert rewards.tolist() == [4, 5, 6, 7]
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        labels, rewards = outcomes()
+        path = tmp_path / "rewards.csv"
+        DataFrame({"label": labels, "reward": rewards}).to_csv(path, index=False)
+        checkpoint = tmp_path / "state.snap"
+
+        exper = BernoulliExperiment(3)
+        apply = exper.add_rewards_bulk
+        calls = []
+
+        def crash_on_fourth_chunk(*args):
+            calls.append(1)
+            if len(calls) == 4:
+                raise RuntimeError("worker died")
+            return apply(*args)
+
+        exper.add_rewards_bulk = crash_on_fourth_chunk
+        with pytest.raises(RuntimeError):
+            exper.add_rewards_stream(path, chunksize=40, checkpoint=checkpoint)
+        assert BernoulliExperiment.load(checkpoint).posteriors == expected(
+            labels[:120], rewards[:120]
+        )
+        restored = resume_stream(checkpoint, path, chunksize=40)
+        assert restored.posteriors == expected(labels, rewards)
+
+    def test_missing_column(self, tmp_path):
+        path = tmp_path / "rewards.csv"
+        path.write_text("arm,value\nA,1\n")
+        with pytest.raises(ValueError):
+            PoissonExperiment(2).add_rewards_stream(path)
+        exper = PoissonExperiment(2, labels=["A", "B"])
+        exper.add_rewards_stream(path, label="arm", reward="value")
+        assert exper.posteriors["A"]["shape"] == pytest.approx(1.001)
+
+    def test_json_array_not_read_as_lines(self, tmp_path):
+        path = tmp_path / "rewards.json"
+        path.write_text(json.dumps([{"label": "option1", "reward": 1}]))
+        with pytest.raises(ValueError):
+            BernoulliExperiment(3).add_rewards_stream(path)
+
+    def test_empty_source_checkpoint(self, tmp_path):
+        path = tmp_path / "rewards.jsonl"
+        path.write_text("")
+        checkpoint = tmp_path / "state.snap"
+        BernoulliExperiment(3).add_rewards_stream(path, checkpoint=checkpoint)
+        restored = resume_stream(checkpoint, path)
+        assert restored.posteriors == expected([], [])